@@ -0,0 +1,99 @@
+"""Concurrent GET /repositories/commits, blocking MysqlClient vs AsyncMysqlClient.
+
+The blocking variant is the route as it was before AsyncMysqlClient: an async
+handler calling MysqlClient directly, so each query stalls the event loop. Both
+serve the same fake database, whose statements take `--latency` seconds.
+
+    python benchmarks/bench_async_mysql.py --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI, Query
+
+# isort: split
+from fakes import install_fake_mysql
+
+# isort: split
+from _config import base_logger
+from _database_pymysql import MysqlClient, get_mysql_pool
+from _schemas import DataResponse
+from api.v1.repositories.service import COMMIT_COLUMNS
+from main import app
+from models import Commit
+
+COMMITS = [
+    {
+        "id": f"C_{i}",
+        "additions": i,
+        "deletions": i,
+        "committedDate": datetime(2024, 1, 1, 0, 0, i % 60),
+        "authorAvatarUrl": "https://avatars.githubusercontent.com/u/1?v=4",
+        "authorName": "author",
+    }
+    for i in range(100)
+]
+
+blocking_app = FastAPI()
+
+
+@blocking_app.get("/api/v1/repositories/commits")
+async def fetch_commits_blocking(repo_id: str = Query(...)) -> DataResponse:
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    try:
+        commits = mysql_client.select(
+            table_name=Commit.__tablename__,
+            select_col=COMMIT_COLUMNS,
+            cond_eq={"repositoryId": repo_id},
+            silent=True,
+        )
+    finally:
+        mysql_client.close()
+    return DataResponse(data=list(commits))
+
+
+async def run(target: FastAPI, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = list()
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await c.get(
+                    "/api/v1/repositories/commits", params={"repo_id": "R"}
+                )
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    install_fake_mysql(lambda query, _: COMMITS, latency=args.latency)
+    for name, target in (("blocking", blocking_app), ("executor", app)):
+        start = time.perf_counter()
+        latencies = asyncio.run(run(target, args.requests, args.concurrency))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>9}: {args.requests / elapsed:8.1f} req/s, "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+            f"max {max(latencies) * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Commit history backfill throughput, against the fake Github and database.
+
+Runs backfill_repository over a branch of `--commits` commits and prints its
+commits per second and the busy time of each pipeline stage. `--github-latency`
+and `--mysql-latency` set the cost of each Github call and MySQL statement.
+
+    python benchmarks/bench_backfill.py --commits 20000 --github-latency 0.2
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from fakes import FakeGithub, install_fake_mysql, statement_count
+
+# isort: split
+from _config import base_logger
+from _database_pymysql import AsyncMysqlClient, get_mysql_pool
+from ingestion import backfill_repository
+
+REPOSITORY = {
+    "id": "R_fake",
+    "name": "fake",
+    "createdAt": datetime(2020, 1, 1),
+    "rootCommitIsReached": 0,
+    "isPrivate": 0,
+    "trackedBranchName": "main",
+    "trackedBranchRef": "refs/heads/main",
+    "backfillHeadId": None,
+    "backfillCursor": None,
+    "syncedHeadId": None,
+    "ownerIsOrganization": 0,
+    "ownerIdUser": "U_0",
+    "ownerIdOrganization": None,
+}
+
+
+def responder(query: str, args) -> list[dict[str, object]]:
+    if "max_allowed_packet" in query:
+        return [{"max_allowed_packet": 64 * 1024 * 1024}]
+    if query.startswith("SELECT * FROM repository"):
+        return [REPOSITORY]
+    return list()
+
+
+async def run(github: FakeGithub) -> dict[str, object]:
+    mysql_client = await AsyncMysqlClient.connect(
+        logger=base_logger, pool=get_mysql_pool()
+    )
+    github_client = github.client()
+    try:
+        return await backfill_repository(
+            repo_id=str(REPOSITORY["id"]),
+            mysql_client=mysql_client,
+            github_client=github_client,
+        )
+    finally:
+        await github_client.close()
+        await mysql_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=20_000)
+    parser.add_argument("--authors", type=int, default=50)
+    parser.add_argument("--github-latency", type=float, default=0.2)
+    parser.add_argument("--mysql-latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    connections = install_fake_mysql(responder, latency=args.mysql_latency)
+    github = FakeGithub(
+        commits=args.commits, authors=args.authors, latency=args.github_latency
+    )
+    stats = asyncio.run(run(github))
+    print(
+        f"{stats['commits']} commits in {stats['seconds']:.2f} s, "
+        f"{stats['commitsPerSecond']:.0f} commits/s, "
+        f"{github.requests} Github calls, {statement_count(connections)} statements"
+    )
+    for name, stage in stats["stages"].items():  # type: ignore
+        print(
+            f"{name:>10}: busy {stage['busySeconds']:6.2f} s, "
+            f"waiting input {stage['waitingInputSeconds']:6.2f} s, "
+            f"waiting output {stage['waitingOutputSeconds']:6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
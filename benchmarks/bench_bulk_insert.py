@@ -0,0 +1,81 @@
+"""Writing commit rows, looping MysqlClient.insert_one vs insert_many.
+
+The fake database charges `--latency` seconds per statement and per commit,
+the round trip and fsync costs insert_many saves. It does not charge for bytes
+sent, so against a real server the gap is somewhat smaller.
+
+    python benchmarks/bench_bulk_insert.py --rows 10000 --latency 0.0005
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from fakes import install_fake_mysql, statement_count
+
+# isort: split
+from _config import base_logger
+from _database_pymysql import MysqlClient, get_mysql_pool
+from models import Commit
+
+
+def commit_rows(n: int) -> list[dict[str, object]]:
+    return [
+        Commit(
+            id=f"C_kwDOAbcdefghij{i:08d}",
+            repositoryId="R_kgDOAbcdefgh",
+            additions=i % 500,
+            deletions=i % 300,
+            authoredDate=datetime(2024, 1, 1, 0, 0, i % 60),
+            authorAvatarUrl="https://avatars.githubusercontent.com/u/1?v=4",
+            authorEmail="author@example.com",
+            authorId="U_kgDOAbcdef",
+            authorName="author",
+            committedDate=datetime(2024, 1, 1, 0, 0, i % 60),
+            committerAvatarUrl="https://avatars.githubusercontent.com/u/2?v=4",
+            committerEmail="committer@example.com",
+            committerId="U_kgDOGhijkl",
+            committerName="committer",
+        ).to_dict()
+        for i in range(n)
+    ]
+
+
+def responder(query: str, args) -> list[dict[str, object]]:
+    if "max_allowed_packet" in query:
+        return [{"max_allowed_packet": 64 * 1024 * 1024}]
+    return list()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    rows = commit_rows(args.rows)
+    connections = install_fake_mysql(responder, latency=args.latency)
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    mysql_client.max_allowed_packet()
+
+    def insert_one():
+        for row in rows:
+            mysql_client.insert_one(Commit.__tablename__, row, silent=True)
+
+    def insert_many():
+        mysql_client.insert_many(Commit.__tablename__, rows, silent=True)
+
+    for name, write in (("insert_one", insert_one), ("insert_many", insert_many)):
+        before = statement_count(connections)
+        start = time.perf_counter()
+        write()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>11}: {args.rows / elapsed:10.0f} rows/s, {elapsed:7.2f} s, "
+            f"{statement_count(connections) - before} statements and commits"
+        )
+    mysql_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Response serialization of fetch_commits and fetch_repositories.
+
+The pydantic variant is the response path as it was before the orjson one:
+routes returning a DataResponse validated against an untyped response_model,
+then encoded with the stdlib JSON encoder. Both call the same services on the
+same rows of the fake database, so the difference is serialization.
+
+    python benchmarks/bench_serialization.py --commits 5000 --repositories 2000
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from fastapi import Depends, FastAPI, Query
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+# isort: split
+from fakes import install_fake_mysql
+
+# isort: split
+from _database_pymysql import AsyncMysqlClient, get_async_mysql_client
+from _schemas import DataResponse
+from api.v1.repositories.service import get_commits, get_repositories
+from main import app
+
+
+def commit_rows(n: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": f"C_kwDOAbcdefghij{i:08d}",
+            "additions": i,
+            "deletions": i,
+            "committedDate": datetime(2024, 1, 1, 12, 0, i % 60),
+            "authorAvatarUrl": "https://avatars.githubusercontent.com/u/1?v=4",
+            "authorName": "author",
+        }
+        for i in range(n)
+    ]
+
+
+def repository_rows(n: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": f"R_kgDOAbcdef{i:06d}",
+            "name": f"repository_{i}",
+            "ownerIdUser": "U_kgDOAbcdef",
+            "ownerIdOrganization": None,
+            "ownerIsOrganization": 0,
+            "ownerLogin": "owner",
+        }
+        for i in range(n)
+    ]
+
+
+pydantic_app = FastAPI(default_response_class=JSONResponse)
+
+
+@pydantic_app.get("/api/v1/repositories/commits", response_model=DataResponse)
+async def fetch_commits(
+    repo_id: str = Query(...),
+    limit: int = Query(...),
+    mysql_client: AsyncMysqlClient = Depends(get_async_mysql_client),
+) -> DataResponse:
+    commits, next_cursor = await get_commits(
+        repo_id=repo_id, mysql_client=mysql_client, limit=limit
+    )
+    return DataResponse(data=commits, next_cursor=next_cursor)
+
+
+@pydantic_app.get("/api/v1/repositories", response_model=DataResponse)
+async def fetch_repositories(
+    mysql_client: AsyncMysqlClient = Depends(get_async_mysql_client),
+) -> DataResponse:
+    return DataResponse(data=await get_repositories(mysql_client=mysql_client))
+
+
+def measure(client: TestClient, url: str, params: dict, runs: int) -> tuple:
+    client.get(url, params=params)
+    timings = list()
+    for _ in range(runs):
+        start = time.perf_counter()
+        resp = client.get(url, params=params)
+        timings.append(time.perf_counter() - start)
+    resp.raise_for_status()
+    return len(resp.content), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--repositories", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    commits = commit_rows(args.commits)
+    repositories = repository_rows(args.repositories)
+    # one row more than the page, as get_commits asks for the next cursor
+    install_fake_mysql(
+        lambda query, _: (
+            commits + commit_rows(1) if "FROM commit" in query else repositories
+        )
+    )
+    endpoints = (
+        ("commits", "/api/v1/repositories/commits", {"limit": args.commits}),
+        ("repositories", "/api/v1/repositories", {}),
+    )
+    for variant, target in (
+        ("pydantic", pydantic_app),
+        ("orjson", app),
+    ):
+        client = TestClient(target)
+        for name, url, params in endpoints:
+            size, median = measure(client, url, {"repo_id": "R", **params}, args.runs)
+            print(
+                f"{name:>12} {variant:>8}: {size:9d} bytes, median {median*1000:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
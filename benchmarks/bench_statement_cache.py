@@ -0,0 +1,231 @@
+"""The statements of get_commits and get_repositories, before and after the
+parameterized builder and its compiled SQL template cache.
+
+`baseline` is the string building code the server started from, ported below:
+values quoted into the text by obj_to_str and generate_cond, a whole history
+select for the commits, and a select_by_id per repository for the owners.
+`uncached` and `cached` call the real service functions, the parameterized
+builder with its compilers unwrapped from and behind their lru_cache.
+
+Every mode runs against a fake database with no latency, so the numbers are the
+client side cost of building and sending statements. The distinct statement
+texts show what the server has to parse: one per value before, one per query
+shape after. Logging is turned down to warnings, in every mode.
+
+    python benchmarks/bench_statement_cache.py --iterations 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from fakes import install_fake_mysql
+
+# isort: split
+import _database_pymysql
+from _config import base_logger
+from _database_pymysql import MysqlClient, get_mysql_pool
+from api.v1.repositories.service import get_commits, get_repositories
+from api.v1.repositories.utils import encode_commit_cursor
+from models import Commit, GitOrganization, GitUser, Repository
+
+COMPILERS = (
+    "compile_cond",
+    "compile_select",
+    "compile_select_join",
+    "compile_count",
+    "compile_delete",
+    "compile_update",
+)
+REPOSITORIES = 20
+START = datetime(2024, 1, 1)
+
+
+class BaselineMysqlClient:
+    """The select path of MysqlClient before parameterization."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def obj_to_str(self, o) -> str:
+        if isinstance(o, int):
+            return str(o)
+        return f"'{o}'"
+
+    def generate_cond(self, cond_eq: dict[str, object] = dict()) -> str:
+        cond = " WHERE 1 = 1 "
+        for col, val in cond_eq.items():
+            if not val:
+                continue
+            cond = cond + f" AND {col} = {self.obj_to_str(val)}"
+        return cond
+
+    def select(
+        self,
+        table_name: str,
+        select_col: list[str] = list(),
+        cond_eq: dict[str, object] = dict(),
+    ) -> tuple[dict[str, object], ...]:
+        query = (
+            f"SELECT {', '.join(select_col) if select_col else '*'} FROM {table_name} "
+        )
+        query = query + self.generate_cond(cond_eq=cond_eq)
+        query = query + ";"
+        with self.connection.cursor() as cursor:
+            cursor.execute(query=query, args=None)
+            return cursor.fetchall()
+
+    def select_by_id(self, table_name: str, id: str, select_col: list[str]) -> dict:
+        res_mysql = self.select(
+            table_name=table_name, select_col=select_col, cond_eq={"id": id}
+        )
+        if not res_mysql:
+            return dict()
+        return res_mysql[0]
+
+
+def baseline_get_commits(mysql_client: BaselineMysqlClient, repo_id: str):
+    commits = mysql_client.select(
+        table_name=Commit.__tablename__,
+        select_col=[
+            "id",
+            "additions",
+            "deletions",
+            "committedDate",
+            "authorAvatarUrl",
+            "authorName",
+        ],
+        cond_eq={"repositoryId": repo_id},
+    )
+    return [c for c in commits]
+
+
+def baseline_get_repositories(mysql_client: BaselineMysqlClient):
+    repos = mysql_client.select(
+        table_name=Repository.__tablename__,
+        select_col=[
+            "id",
+            "name",
+            "ownerIdUser",
+            "ownerIdOrganization",
+            "ownerIsOrganization",
+        ],
+    )
+    for repo in repos:
+        if repo["ownerIsOrganization"]:
+            owner = mysql_client.select_by_id(
+                table_name=GitOrganization.__tablename__,
+                id=str(repo["ownerIdOrganization"]),
+                select_col=["login"],
+            )
+        else:
+            owner = mysql_client.select_by_id(
+                table_name=GitUser.__tablename__,
+                id=str(repo["ownerIdUser"]),
+                select_col=["login"],
+            )
+        repo["ownerLogin"] = owner["login"]
+    return [r for r in repos]
+
+
+class InlineAsyncMysqlClient:
+    """The awaitable select methods of AsyncMysqlClient, run on the calling
+    thread, so the executor hop does not drown the statement building."""
+
+    def __init__(self, mysql_client: MysqlClient):
+        self.mysql_client = mysql_client
+
+    async def select(self, **kwargs):
+        return self.mysql_client.select(**kwargs)
+
+    async def select_join(self, **kwargs):
+        return self.mysql_client.select_join(**kwargs)
+
+
+def respond(query: str, _) -> list[dict[str, object]]:
+    if "FROM repository" in query:
+        return [
+            {
+                "id": f"R_{i}",
+                "name": f"repo-{i}",
+                "ownerIdUser": None if i % 2 else f"U_{i}",
+                "ownerIdOrganization": f"O_{i}" if i % 2 else None,
+                "ownerIsOrganization": i % 2,
+                "ownerLogin": "owner",
+            }
+            for i in range(REPOSITORIES)
+        ]
+    if "FROM git_" in query:
+        return [{"login": "owner"}]
+    return list()
+
+
+# encoded once, a client sends back the cursor of the previous page
+CURSORS = [
+    encode_commit_cursor(
+        committed_date=START + timedelta(seconds=i), commit_id=f"C_{i}"
+    )
+    for i in range(1000)
+]
+
+
+async def run_current(path: str, mysql_client, iterations: int):
+    for i in range(iterations):
+        if path == "get_commits":
+            await get_commits(
+                repo_id=f"R_{i % 1000}",
+                mysql_client=mysql_client,
+                cursor=CURSORS[i % 1000],
+            )
+        else:
+            await get_repositories(mysql_client=mysql_client)
+
+
+def run_baseline(path: str, mysql_client: BaselineMysqlClient, iterations: int):
+    for i in range(iterations):
+        if path == "get_commits":
+            baseline_get_commits(mysql_client, repo_id=f"R_{i % 1000}")
+        else:
+            baseline_get_repositories(mysql_client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    base_logger.setLevel(logging.WARNING)
+
+    connections = install_fake_mysql(respond)
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    async_client = InlineAsyncMysqlClient(mysql_client)
+    baseline_client = BaselineMysqlClient(connections[0])
+    cached = {name: getattr(_database_pymysql, name) for name in COMPILERS}
+    uncached = {name: compiler.__wrapped__ for name, compiler in cached.items()}
+
+    for path in ("get_commits", "get_repositories"):
+        for mode in ("baseline", "uncached", "cached"):
+            for name, compiler in (uncached if mode == "uncached" else cached).items():
+                setattr(_database_pymysql, name, compiler)
+            connections[0].statements.clear()
+            start = time.perf_counter()
+            if mode == "baseline":
+                run_baseline(path, baseline_client, args.iterations)
+            else:
+                asyncio.run(run_current(path, async_client, args.iterations))
+            elapsed = time.perf_counter() - start
+            statements = connections[0].statements
+            texts = {query for query, _ in statements}
+            print(
+                f"{path:>16} {mode:>8}: {args.iterations / elapsed:9.0f} calls/s, "
+                f"{len(statements) / args.iterations:4.1f} statements per call, "
+                f"{len(texts)} distinct statement texts"
+            )
+    for name, compiler in cached.items():
+        setattr(_database_pymysql, name, compiler)
+    mysql_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""In-process stand-ins for MySQL and Github, so benchmarks run without either.
+
+FakeConnection answers pymysql calls from a `responder` and sleeps `latency`
+seconds per statement, the time a round trip to a real server would block the
+calling thread. FakeGithub serves a linear commit history to a GithubClient
+through an httpx mock transport, answering each call after `latency` seconds.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import pymysql.converters
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import _database_pymysql  # noqa: E402
+from _config import DateTimeFormat  # noqa: E402
+from _github_api import GithubClient  # noqa: E402
+
+Responder = Callable[[str, object], list[dict[str, object]]]
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection") -> None:
+        self.connection = connection
+        self.rowcount = 0
+        self._executed = None
+        self._rows: list[dict[str, object]] = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def execute(self, query: str, args=None) -> int:
+        if self.connection.latency:
+            time.sleep(self.connection.latency)
+        query = " ".join(query.split())
+        self._executed = (query, args)
+        self.connection.statements.append((query, args))
+        self._rows = list(self.connection.responder(query, args))
+        self.rowcount = len(self._rows)
+        return self.rowcount
+
+    def fetchall(self) -> tuple[dict[str, object], ...]:
+        rows, self._rows = self._rows, list()
+        return tuple(rows)
+
+    def fetchmany(self, size: int) -> list[dict[str, object]]:
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        self._rows = list()
+
+
+class FakeConnection:
+    def __init__(self, responder: Responder, latency: float = 0.0) -> None:
+        self.responder = responder
+        self.latency = latency
+        self.open = True
+        self.statements: list[tuple[str, object]] = list()
+
+    def cursor(self, cursor_class=None) -> FakeCursor:
+        return FakeCursor(self)
+
+    def ping(self, reconnect: bool = False):
+        pass
+
+    def begin(self):
+        self.statements.append(("BEGIN", None))
+
+    def commit(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.statements.append(("COMMIT", None))
+
+    def rollback(self):
+        self.statements.append(("ROLLBACK", None))
+
+    def close(self):
+        self.open = False
+
+    def escape(self, obj, mapping=None):
+        return pymysql.converters.escape_item(obj, "utf8mb4", mapping)
+
+
+def install_fake_mysql(
+    responder: Responder, latency: float = 0.0
+) -> list[FakeConnection]:
+    """Make the pools of _database_pymysql open FakeConnections.
+
+    Returns the list every connection opened from now on is appended to.
+    """
+    connections: list[FakeConnection] = list()
+
+    def connect() -> FakeConnection:
+        connection = FakeConnection(responder=responder, latency=latency)
+        connections.append(connection)
+        return connection
+
+    _database_pymysql.connect_mysql = connect  # type: ignore
+    _database_pymysql.close_mysql_pool()
+    return connections
+
+
+def statement_count(connections: list[FakeConnection]) -> int:
+    return sum(len(connection.statements) for connection in connections)
+
+
+class FakeGithub:
+    """Github GraphQL API serving a branch of `commits` commits, newest first.
+
+    Answers the branch head and history queries of the ingestion package, with
+    authors among `authors` distinct users. History cursors are the offset of
+    the next commit.
+    """
+
+    def __init__(self, commits: int, authors: int = 50, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        start = datetime(2020, 1, 1)
+        self.history = [
+            self.__commit_node(i, start + timedelta(minutes=commits - i), authors)
+            for i in range(commits)
+        ]
+
+    @staticmethod
+    def __commit_node(i: int, date: datetime, authors: int) -> dict:
+        user_id = f"U_{i % authors}"
+        actor = {
+            "avatarUrl": f"https://avatars.githubusercontent.com/u/{i % authors}",
+            "email": f"{user_id}@example.com",
+            "name": user_id,
+            "user": {
+                "avatarUrl": f"https://avatars.githubusercontent.com/u/{i % authors}",
+                "email": f"{user_id}@example.com",
+                "id": user_id,
+                "login": user_id.lower(),
+                "name": user_id,
+            },
+        }
+        return {
+            "id": f"C_{i:08d}",
+            "additions": i % 500,
+            "deletions": i % 300,
+            "authoredDate": date.strftime(DateTimeFormat.github),
+            "committedDate": date.strftime(DateTimeFormat.github),
+            "author": actor,
+            "committer": actor,
+        }
+
+    def __history_page(self, variables: dict) -> dict:
+        offset = int(variables.get("after") or 0)
+        if variables["headId"] != self.history[0]["id"]:
+            offset += [node["id"] for node in self.history].index(variables["headId"])
+        end = offset + int(variables["first"])
+        return {
+            "node": {
+                "history": {
+                    "pageInfo": {
+                        "hasNextPage": end < len(self.history),
+                        "endCursor": str(end),
+                    },
+                    "nodes": self.history[offset:end],
+                }
+            }
+        }
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payload = json.loads(request.content)
+        query, variables = payload["query"], payload.get("variables") or dict()
+        if "history(" in query:
+            data = self.__history_page(variables)
+        elif "trackedBranch" in query:
+            head = {"target": {"id": self.history[0]["id"]}}
+            data = {"nodes": [{"trackedBranch": head} for _ in variables["ids"]]}
+        else:
+            return httpx.Response(200, json={"errors": [{"message": "unknown"}]})
+        return httpx.Response(200, json={"data": data})
+
+    def client(self) -> GithubClient:
+        transport = httpx.MockTransport(self.handle)
+        return GithubClient(
+            token="fake", http_client=httpx.AsyncClient(transport=transport)
+        )
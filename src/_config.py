@@ -22,8 +22,53 @@ MYSQL_USER = os.getenv("MYSQL_USER", "")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
 MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
 MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
+MYSQL_POOL_MIN_SIZE = int(os.getenv("MYSQL_POOL_MIN_SIZE", 1))
+MYSQL_POOL_MAX_SIZE = int(os.getenv("MYSQL_POOL_MAX_SIZE", 10))
+MYSQL_POOL_MAX_LIFETIME = float(os.getenv("MYSQL_POOL_MAX_LIFETIME", 3600))
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", 30))
+MYSQL_STATEMENT_CACHE_SIZE = int(os.getenv("MYSQL_STATEMENT_CACHE_SIZE", 512))
+MYSQL_STREAM_BATCH_SIZE = int(os.getenv("MYSQL_STREAM_BATCH_SIZE", 1000))
+MYSQL_EXECUTOR_MAX_WORKERS = int(
+    os.getenv("MYSQL_EXECUTOR_MAX_WORKERS", MYSQL_POOL_MAX_SIZE)
+)
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+# comma separated, requests are spread across them
+GITHUB_TOKENS = [
+    token.strip()
+    for token in os.getenv("GITHUB_TOKENS", GITHUB_TOKEN).split(",")
+    if token.strip()
+]
+# seconds a token Github refused (401) is left aside before being tried again
+GITHUB_TOKEN_COOLDOWN = float(os.getenv("GITHUB_TOKEN_COOLDOWN", 600))
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com/graphql")
+GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "False").lower() == "true"
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", 20))
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", 10)
+)
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", 5))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", 30))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 3))
+GITHUB_BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", 0.5))
+GITHUB_BACKOFF_MAX = float(os.getenv("GITHUB_BACKOFF_MAX", 30))
+GITHUB_BREAKER_FAILURE_THRESHOLD = int(os.getenv("GITHUB_BREAKER_FAILURE_THRESHOLD", 5))
+GITHUB_BREAKER_RESET_TIMEOUT = float(os.getenv("GITHUB_BREAKER_RESET_TIMEOUT", 30))
+GITHUB_RATE_LIMIT_POINTS = int(os.getenv("GITHUB_RATE_LIMIT_POINTS", 5000))
+GITHUB_BACKGROUND_RESERVE = int(os.getenv("GITHUB_BACKGROUND_RESERVE", 500))
+GITHUB_CACHE_MAX_SIZE = int(os.getenv("GITHUB_CACHE_MAX_SIZE", 1024))
+# repository and owner metadata, read when a repository is tracked
+GITHUB_CACHE_TTL = float(os.getenv("GITHUB_CACHE_TTL", 3600))
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 2))
+INGESTION_POLL_INTERVAL = float(os.getenv("INGESTION_POLL_INTERVAL", 5))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", 3))
+# a running job not updated for that long is considered dead and claimed again
+INGESTION_JOB_STALE_AFTER = float(os.getenv("INGESTION_JOB_STALE_AFTER", 600))
+# running jobs touch their updatedAt that often, keep it well under the above
+INGESTION_JOB_HEARTBEAT_INTERVAL = float(
+    os.getenv("INGESTION_JOB_HEARTBEAT_INTERVAL", 60)
+)
 
 
 class DateTimeFormat:
@@ -1,14 +1,30 @@
 ## TODO: Migrate to other than pymysql to support async
+import asyncio
+import os
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from logging import Logger
+from typing import AsyncIterator, Callable, Iterator
 
 import pymysql.cursors
 
 from _config import (
     MYSQL_DATABASE,
+    MYSQL_EXECUTOR_MAX_WORKERS,
     MYSQL_HOST,
     MYSQL_PASSWORD,
+    MYSQL_POOL_MAX_LIFETIME,
+    MYSQL_POOL_MAX_SIZE,
+    MYSQL_POOL_MIN_SIZE,
+    MYSQL_POOL_TIMEOUT,
     MYSQL_PORT,
+    MYSQL_STATEMENT_CACHE_SIZE,
+    MYSQL_STREAM_BATCH_SIZE,
     MYSQL_USER,
     base_logger,
 )
@@ -39,54 +55,493 @@ class MySqlWrongQueryError(Exception):
         super().__init__(detail)
 
 
+class MySqlInconsistentColumnsError(Exception):
+    def __init__(self, row_index: int):
+        super().__init__(f"Row {row_index} does not have the same columns as row 0.")
+
+
+class MySqlNoTransactionError(Exception):
+    def __init__(self):
+        super().__init__("No transaction opened.")
+
+
+class MySqlPoolExhaustedError(Exception):
+    def __init__(self, timeout: float):
+        super().__init__(f"No connection available in pool after {timeout=}s.")
+
+
+def connect_mysql() -> pymysql.Connection:
+    return pymysql.connect(
+        host=MYSQL_HOST,
+        port=MYSQL_PORT,
+        user=MYSQL_USER,
+        passwd=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE,
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+    )
+
+
+class MysqlConnectionPool:
+    """Thread-safe pool of pymysql connections, meant to be shared by a worker.
+
+    Connections are pinged when checked out, and closed once they are older than
+    `max_lifetime` seconds. Checkin rolls back whatever the borrower left open so
+    the next borrower does not inherit a stale read snapshot.
+    """
+
+    def __init__(
+        self,
+        min_size: int = MYSQL_POOL_MIN_SIZE,
+        max_size: int = MYSQL_POOL_MAX_SIZE,
+        max_lifetime: float = MYSQL_POOL_MAX_LIFETIME,
+        timeout: float = MYSQL_POOL_TIMEOUT,
+        logger: Logger | None = None,
+    ):
+        self.logger = logger if logger else base_logger
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._condition = threading.Condition()
+        self._idle: list[pymysql.Connection] = []
+        self._created_at: dict[int, float] = dict()
+        self._size = 0
+        self._closed = False
+        self._counters = {
+            "created": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "waits": 0,
+            "timeouts": 0,
+        }
+        for _ in range(self.min_size):
+            self._idle.append(self.__create())
+            self._size += 1
+
+    def __create(self) -> pymysql.Connection:
+        connection = connect_mysql()
+        with self._condition:
+            self._created_at[id(connection)] = time.monotonic()
+            self._counters["created"] += 1
+        return connection
+
+    def __is_expired(self, connection) -> bool:
+        created_at = self._created_at.get(id(connection), 0.0)
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def __is_usable(self, connection) -> bool:
+        if not connection.open or self.__is_expired(connection):
+            return False
+        try:
+            connection.ping(reconnect=False)
+        except pymysql.err.Error:
+            return False
+        return True
+
+    def discard(self, connection):
+        """Close a connection and release its slot in the pool."""
+        try:
+            connection.close()
+        except pymysql.err.Error:
+            pass
+        with self._condition:
+            if self._created_at.pop(id(connection), None) is not None:
+                self._size -= 1
+                self._counters["discarded"] += 1
+            self._condition.notify()
+
+    def checkout(self) -> pymysql.Connection:
+        """Borrow a live connection, creating one if the pool is not full.
+
+        Raises
+        ------
+        MySqlPoolExhaustedError
+            If no connection got free within `timeout` seconds
+        MySqlNoConnectionError
+            If the pool is closed or the database cannot be reached
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection = None
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    if self._closed:
+                        raise MySqlNoConnectionError()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise MySqlPoolExhaustedError(timeout=self.timeout)
+                    self._counters["waits"] += 1
+                    self._condition.wait(remaining)
+                if self._closed:
+                    raise MySqlNoConnectionError()
+                if self._idle:
+                    connection = self._idle.pop()
+                else:
+                    self._size += 1
+
+            if connection is None:
+                try:
+                    connection = self.__create()
+                except pymysql.err.Error:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    self.logger.critical(
+                        f"ERROR: could not connect to Database, {traceback.format_exc()}"
+                    )
+                    raise MySqlNoConnectionError()
+            elif not self.__is_usable(connection):
+                self.discard(connection)
+                continue
+
+            with self._condition:
+                self._counters["checkouts"] += 1
+            return connection
+
+    def checkin(self, connection):
+        """Give a borrowed connection back to the pool."""
+        if self._closed or not connection.open or self.__is_expired(connection):
+            self.discard(connection)
+            return
+        try:
+            connection.rollback()
+        except pymysql.err.Error:
+            self.discard(connection)
+            return
+        with self._condition:
+            self._idle.append(connection)
+            self._counters["checkins"] += 1
+            self._condition.notify()
+
+    def stats(self) -> dict[str, int]:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                **self._counters,
+            }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for connection in idle:
+            self.discard(connection)
+
+
+_mysql_pool: MysqlConnectionPool | None = None
+_mysql_pool_lock = threading.Lock()
+_max_allowed_packet: int | None = None
+
+
+def get_mysql_pool() -> MysqlConnectionPool:
+    """Return the pool of the current worker process, creating it on first use.
+
+    Gunicorn forks its workers after importing the app, so the pool is keyed on the
+    pid to never share sockets between processes.
+    """
+    global _mysql_pool
+    with _mysql_pool_lock:
+        if _mysql_pool is None or _mysql_pool.pid != os.getpid():
+            _mysql_pool = MysqlConnectionPool()
+        return _mysql_pool
+
+
+def close_mysql_pool():
+    global _mysql_pool
+    with _mysql_pool_lock:
+        if _mysql_pool is not None and _mysql_pool.pid == os.getpid():
+            base_logger.info(f"closing mysql pool, {_mysql_pool.stats()=}")
+            _mysql_pool.close()
+        _mysql_pool = None
+
+
+@lru_cache(maxsize=MYSQL_STATEMENT_CACHE_SIZE)
+def compile_cond(cond_shape: tuple[tuple, ...], clause: str = "WHERE") -> str:
+    cond = f" {clause} 1 = 1"
+    for col, operator, *size in cond_shape:
+        if operator in ("IS NULL", "IS NOT NULL"):
+            cond = cond + f" AND {col} {operator}"
+        elif operator == "IN":
+            cond = cond + f" AND {col} IN ({', '.join(['%s'] * size[0])})"
+        else:
+            cond = cond + f" AND {col} {operator} %s"
+    return cond
+
+
+def compile_seek(seek_col: tuple[str, ...], ascending_order: bool) -> str:
+    """Keyset condition selecting the rows strictly after a position.
+
+    For (a, b) in ascending order this gives `a >= %s AND (a > %s OR (a = %s AND
+    b > %s))`, whose leading bound lets MySQL range-scan an index on (a, b). Args
+    are built by seek_args.
+    """
+    operator = ">" if ascending_order else "<"
+    branches = list()
+    for i, col in enumerate(seek_col):
+        equalities = [f"{prev_col} = %s" for prev_col in seek_col[:i]]
+        branches.append(" AND ".join(equalities + [f"{col} {operator} %s"]))
+    return f" AND {seek_col[0]} {operator}= %s AND (({') OR ('.join(branches)}))"
+
+
+def seek_args(seek_after: list[object]) -> tuple:
+    args = [seek_after[0]]
+    for i in range(len(seek_after)):
+        args.extend(seek_after[: i + 1])
+    return tuple(args)
+
+
+@lru_cache(maxsize=MYSQL_STATEMENT_CACHE_SIZE)
+def compile_select(
+    table_name: str,
+    select_col: tuple[str, ...],
+    cond_shape: tuple[tuple, ...],
+    order_by: str,
+    ascending_order: bool,
+    paginated: bool,
+    seek_col: tuple[str, ...] = tuple(),
+    seek: bool = False,
+    for_update: bool = False,
+    skip_locked: bool = False,
+) -> str:
+    query = f"SELECT {', '.join(select_col) if select_col else '*'} FROM {table_name}"
+    query = query + compile_cond(cond_shape)
+    direction = "ASC" if ascending_order else "DESC"
+    if seek:
+        query = query + compile_seek(seek_col, ascending_order)
+    if seek_col:
+        query = query + " ORDER BY " + ", ".join([f"{c} {direction}" for c in seek_col])
+    elif order_by:
+        query = query + f" ORDER BY {order_by} {direction}"
+    if paginated:
+        query = query + " LIMIT %s OFFSET %s"
+    if for_update:
+        query = query + " FOR UPDATE"
+        if skip_locked:
+            query = query + " SKIP LOCKED"
+    return query + ";"
+
+
+@lru_cache(maxsize=MYSQL_STATEMENT_CACHE_SIZE)
+def compile_count(
+    table_name: str, select_col: tuple[str, ...], cond_shape: tuple[tuple, ...]
+) -> str:
+    query = f"SELECT COUNT({', '.join(select_col) if select_col else '*'}) AS ct"
+    query = query + f" FROM {table_name}" + compile_cond(cond_shape)
+    return query + ";"
+
+
+@lru_cache(maxsize=MYSQL_STATEMENT_CACHE_SIZE)
+def compile_delete(table_name: str, cond_shape: tuple[tuple, ...]) -> str:
+    return f"DELETE FROM {table_name}" + compile_cond(cond_shape) + ";"
+
+
+@lru_cache(maxsize=MYSQL_STATEMENT_CACHE_SIZE)
+def compile_update(
+    table_name: str,
+    update_col_col: tuple[tuple[str, str], ...],
+    update_value_col: tuple[str, ...],
+    cond_shape: tuple[tuple, ...],
+) -> str:
+    update_ls = [f"{col} = {other_col}" for col, other_col in update_col_col]
+    update_ls = update_ls + [f"{col} = %s" for col in update_value_col]
+    query = f"UPDATE {table_name} SET {', '.join(update_ls)}"
+    return query + compile_cond(cond_shape) + ";"
+
+
+@dataclass(frozen=True)
+class MySqlJoin:
+    """Table joined in MysqlClient.select_join.
+
+    `on` holds (left column, right column) pairs, qualified with their table
+    name or alias, e.g. (("repository.ownerIdUser", "git_user.id"),).
+    """
+
+    table_name: str
+    on: tuple[tuple[str, str], ...]
+    kind: str = "LEFT"
+    alias: str = ""
+
+    def __post_init__(self):
+        if self.kind not in ("INNER", "LEFT", "RIGHT"):
+            raise MySqlWrongQueryError(f"unknown join kind, {self.kind=}")
+        if not self.on:
+            raise MySqlWrongQueryError(f"no join condition for {self.table_name=}")
+
+
+@dataclass(frozen=True)
+class MySqlAggregate:
+    """Aggregate selected in MysqlClient.select_join, as `function(column) AS alias`."""
+
+    function: str
+    column: str
+    alias: str
+    distinct: bool = False
+
+    def __post_init__(self):
+        if self.function not in ("COUNT", "SUM", "MIN", "MAX", "AVG"):
+            raise MySqlWrongQueryError(f"unknown aggregate, {self.function=}")
+
+
+@lru_cache(maxsize=MYSQL_STATEMENT_CACHE_SIZE)
+def compile_select_join(
+    table_name: str,
+    joins: tuple[MySqlJoin, ...],
+    select_col: tuple[str, ...],
+    aggregates: tuple[MySqlAggregate, ...],
+    cond_shape: tuple[tuple, ...],
+    group_by: tuple[str, ...],
+    having_shape: tuple[tuple, ...],
+    order_by: tuple[tuple[str, bool], ...],
+    paginated: bool,
+) -> str:
+    selected = list(select_col) + [
+        f"{agg.function}({'DISTINCT ' if agg.distinct else ''}{agg.column}) AS {agg.alias}"
+        for agg in aggregates
+    ]
+    query = f"SELECT {', '.join(selected) if selected else '*'} FROM {table_name}"
+    for join in joins:
+        on = " AND ".join([f"{left} = {right}" for left, right in join.on])
+        table = f"{join.table_name} {join.alias}" if join.alias else join.table_name
+        query = query + f" {join.kind} JOIN {table} ON {on}"
+    query = query + compile_cond(cond_shape)
+    if group_by:
+        query = query + f" GROUP BY {', '.join(group_by)}"
+    if having_shape:
+        query = query + compile_cond(having_shape, clause="HAVING")
+    if order_by:
+        query = (
+            query
+            + " ORDER BY "
+            + ", ".join(
+                [
+                    f"{col} {'ASC' if ascending else 'DESC'}"
+                    for col, ascending in order_by
+                ]
+            )
+        )
+    if paginated:
+        query = query + " LIMIT %s OFFSET %s"
+    return query + ";"
+
+
+def statement_cache_info() -> dict[str, object]:
+    return {
+        compiler.__name__: compiler.cache_info()._asdict()
+        for compiler in (
+            compile_cond,
+            compile_select,
+            compile_select_join,
+            compile_count,
+            compile_delete,
+            compile_update,
+        )
+    }
+
+
 class MysqlClient:
-    def __init__(self, logger: Logger | None = None):
+    def __init__(
+        self,
+        logger: Logger | None = None,
+        pool: MysqlConnectionPool | None = None,
+    ):
         self.logger = logger if logger else base_logger
         self.connection: pymysql.Connection[pymysql.cursors.DictCursor] | None = None
-        self.port = MYSQL_PORT
-        self.host = MYSQL_HOST
-        self.user = MYSQL_USER
-        self.password = MYSQL_PASSWORD
-        self.database = MYSQL_DATABASE
+        self.pool = pool
+        self.transaction_depth = 0
         self.__connect()
 
     def __connect(self):
-        self.connection = pymysql.connect(
-            host=self.host,
-            port=self.port,
-            user=self.user,
-            passwd=self.password,
-            database=self.database,
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor,
-        )
+        if self.pool:
+            self.connection = self.pool.checkout()
+            return
+        self.connection = connect_mysql()
 
     def check_alive(self):
         try:
+            if not self.connection:
+                self.__connect()
+                return
             try:
-                check_alive_res = self.execute("select 1;")
-            except:
-                check_alive_res = None
-            if not check_alive_res:
+                self.connection.ping(reconnect=False)
+            except pymysql.err.Error:
+                if self.pool:
+                    self.pool.discard(self.connection)
+                self.connection = None
                 self.__connect()
         except:
             self.logger.critical("ERROR: Lost connection to Database.")
             raise MySqlNoConnectionError()
 
+    def commit(self):
+        """Commit the current work, unless a transaction scope will do it on exit."""
+        if self.transaction_depth:
+            return
+        if not self.connection:
+            raise MySqlNoConnectionError()
+        self.connection.commit()
+
+    def begin_transaction(self):
+        """Open a transaction, or a savepoint if one is already opened."""
+        if not self.connection:
+            raise MySqlNoConnectionError()
+        if self.transaction_depth:
+            self.execute(query=f"SAVEPOINT sp_{self.transaction_depth};", silent=True)
+        else:
+            self.connection.begin()
+        self.transaction_depth += 1
+
+    def end_transaction(self, rollback: bool = False):
+        """Close the innermost transaction scope.
+
+        The outermost scope commits or rolls back the whole transaction, nested
+        ones release or roll back to their savepoint.
+        """
+        if not self.connection:
+            raise MySqlNoConnectionError()
+        if not self.transaction_depth:
+            raise MySqlNoTransactionError()
+        self.transaction_depth -= 1
+        if self.transaction_depth:
+            savepoint = f"sp_{self.transaction_depth}"
+            query = (
+                f"ROLLBACK TO SAVEPOINT {savepoint};"
+                if rollback
+                else f"RELEASE SAVEPOINT {savepoint};"
+            )
+            self.execute(query=query, silent=True)
+        elif rollback:
+            self.connection.rollback()
+        else:
+            self.connection.commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator["MysqlClient"]:
+        """Group writes in one transaction, committed once when the scope exits.
+
+        Write methods called inside the scope do not commit. Any exception rolls
+        the scope back and is re-raised. Scopes can be nested, inner ones then
+        use savepoints.
+        """
+        self.begin_transaction()
+        try:
+            yield self
+        except BaseException:
+            self.end_transaction(rollback=True)
+            raise
+        self.end_transaction()
+
     def logging(self, cursor):
         self.logger.debug(f"MysqlClient executed: {str(cursor._executed)}")
         self.logger.debug(f"{cursor.rowcount=}")
 
-    def obj_to_str(self, o) -> str:
-        if isinstance(o, int):
-            return str(o)
-        return f"'{o}'"
-
-    def ls_obj_to_str(self, ls: list) -> list:
-        if not ls:
-            return ls
-        return [self.obj_to_str(e) for e in ls]
-
     def generate_cond(
         self,
         cond_null: list[str] = list(),
@@ -98,41 +553,45 @@ class MysqlClient:
         cond_geq: dict[str, object] = dict(),
         cond_l: dict[str, object] = dict(),
         cond_g: dict[str, object] = dict(),
-    ) -> str:
-        cond = " WHERE 1 = 1 "
+    ) -> tuple[tuple[tuple, ...], tuple]:
+        """Split conditions into a hashable shape and the matching query args.
+
+        The shape only holds columns and operators, so queries differing only by
+        their values share one compiled SQL template. IN lists are padded to the
+        next power of two with their last value to keep the number of shapes low.
+
+        Returns
+        -------
+        tuple
+            (shape, args), to be compiled with compile_cond
+        """
+        shape: list[tuple] = list()
+        args: list[object] = list()
         for col in cond_null:
-            cond = cond + f" AND {col} IS NULL "
+            shape.append((col, "IS NULL"))
         for col in cond_not_null:
-            cond = cond + f" AND {col} IS NOT NULL "
+            shape.append((col, "IS NOT NULL"))
         for col, ls_val in cond_in.items():
             if not ls_val:
                 continue
-            cond = cond + f" AND {col} IN ({', '.join(self.ls_obj_to_str(ls_val))})"
-        for col, val in cond_eq.items():
-            if not val:
-                continue
-            cond = cond + f" AND {col} = {self.obj_to_str(val)}"
-        for col, val in cond_neq.items():
-            if not val:
-                continue
-            cond = cond + f" AND {col} <> {self.obj_to_str(val)}"
-        for col, val in cond_leq.items():
-            if not val:
-                continue
-            cond = cond + f" AND {col} <= {self.obj_to_str(val)}"
-        for col, val in cond_geq.items():
-            if not val:
-                continue
-            cond = cond + f" AND {col} >= {self.obj_to_str(val)}"
-        for col, val in cond_l.items():
-            if not val:
-                continue
-            cond = cond + f" AND {col} < {self.obj_to_str(val)}"
-        for col, val in cond_g.items():
-            if not val:
-                continue
-            cond = cond + f" AND {col} > {self.obj_to_str(val)}"
-        return cond
+            size = 1 << (len(ls_val) - 1).bit_length()
+            shape.append((col, "IN", size))
+            args.extend(ls_val)
+            args.extend([ls_val[-1]] * (size - len(ls_val)))
+        for operator, cond in (
+            ("=", cond_eq),
+            ("<>", cond_neq),
+            ("<=", cond_leq),
+            (">=", cond_geq),
+            ("<", cond_l),
+            (">", cond_g),
+        ):
+            for col, val in cond.items():
+                if not val:
+                    continue
+                shape.append((col, operator))
+                args.append(val)
+        return tuple(shape), tuple(args)
 
     def delete(
         self,
@@ -147,7 +606,8 @@ class MysqlClient:
         cond_l: dict[str, object] = dict(),
         cond_g: dict[str, object] = dict(),
         silent: bool = False,
-    ) -> tuple[dict[str, object], ...]:
+        return_rows: bool = False,
+    ) -> tuple[dict[str, object], ...] | int:
         """Delete rows from a database table based on conditions.
 
         Parameters
@@ -174,11 +634,16 @@ class MysqlClient:
             Column values that must be greater than given value
         silent : bool, optional
             If True, suppress logging of the query execution, by default False
+        return_rows : bool, optional
+            If True, select the rows before deleting them and return them, at the
+            cost of an extra round trip, by default False
 
         Returns
         -------
+        int
+            Number of deleted rows, if return_rows is False
         tuple
-            Tuple containing the deleted rows' data
+            Tuple containing the deleted rows' data, if return_rows is True
 
         Raises
         ------
@@ -187,21 +652,22 @@ class MysqlClient:
         MySqlWrongQueryError
             If query is wrong
         """
-        res_mysql = self.select(
-            table_name=table_name,
-            cond_eq=cond_eq,
-            cond_g=cond_g,
-            cond_geq=cond_geq,
-            cond_in=cond_in,
-            cond_l=cond_l,
-            cond_leq=cond_leq,
-            cond_neq=cond_neq,
-            cond_not_null=cond_not_null,
-            cond_null=cond_null,
-            silent=True,
-        )
-        query = f"DELETE FROM {table_name} "
-        query = query + self.generate_cond(
+        res_mysql: tuple[dict[str, object], ...] = tuple()
+        if return_rows:
+            res_mysql = self.select(
+                table_name=table_name,
+                cond_eq=cond_eq,
+                cond_g=cond_g,
+                cond_geq=cond_geq,
+                cond_in=cond_in,
+                cond_l=cond_l,
+                cond_leq=cond_leq,
+                cond_neq=cond_neq,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+                silent=True,
+            )
+        cond_shape, args = self.generate_cond(
             cond_eq=cond_eq,
             cond_g=cond_g,
             cond_geq=cond_geq,
@@ -212,16 +678,14 @@ class MysqlClient:
             cond_not_null=cond_not_null,
             cond_null=cond_null,
         )
-        query = query + ";"
+        query = compile_delete(table_name=table_name, cond_shape=cond_shape)
         try:
-            self.execute(query=query, silent=silent)
+            deleted = self.execute_rowcount(query=query, args=args, silent=silent)
         except MySqlWrongQueryError as e:
-            self.logger.warning(
-                f"wrong query when updating by id, {traceback.format_exc()}"
-            )
+            self.logger.warning(f"wrong query when deleting, {traceback.format_exc()}")
             raise e
-        self.connection.commit()  # type: ignore
-        return res_mysql
+        self.commit()
+        return res_mysql if return_rows else deleted
 
     def execute(
         self, query: str, args: tuple | dict | None = None, silent=False
@@ -265,6 +729,107 @@ class MysqlClient:
                 self.logging(cursor)
         return res
 
+    def execute_rowcount(
+        self, query: str, args: tuple | dict | None = None, silent=False
+    ) -> int:
+        """Execute a SQL statement and return the number of affected rows.
+
+        Parameters
+        ----------
+        query : str
+            SQL statement to execute
+        args : tuple | dict | None, optional
+            Parameters to pass to the statement, by default None
+        silent : bool, optional
+            If True, suppress logging of the query execution, by default False
+
+        Returns
+        -------
+        int
+            Number of rows affected by the statement
+
+        Raises
+        ------
+        NoConnectionError
+            If no database connection exists
+        MySqlWrongQueryError
+            If query is wrong
+        """
+        if not self.connection:
+            self.logger.error("could not execute query, no connection to Database")
+            raise MySqlNoConnectionError()
+        with self.connection.cursor() as cursor:
+            try:
+                rowcount = cursor.execute(query=query, args=args)
+            except pymysql.err.ProgrammingError as e:
+                self.logger.warning(
+                    f"error while executing query, {traceback.format_exc()}"
+                )
+                raise MySqlWrongQueryError(f"{type(e)=}, {str(e)=}")
+            if not silent:
+                self.logging(cursor)
+        return rowcount
+
+    def max_allowed_packet(self) -> int:
+        """Server max_allowed_packet in bytes, fetched once per worker."""
+        global _max_allowed_packet
+        if _max_allowed_packet is None:
+            res = self.execute(
+                query="SELECT @@max_allowed_packet AS max_allowed_packet;",
+                silent=True,
+            )
+            _max_allowed_packet = int(str(res[0]["max_allowed_packet"]))
+        return _max_allowed_packet
+
+    def __insert_rows(
+        self,
+        table_name: str,
+        values: list[dict[str, object]],
+        or_ignore: bool,
+        on_duplicate: str,
+        silent: bool,
+    ) -> int:
+        columns = list(values[0])
+        for i, row in enumerate(values):
+            if row.keys() != values[0].keys():
+                raise MySqlInconsistentColumnsError(row_index=i)
+
+        head = (
+            f"INSERT {'IGNORE' if or_ignore else ''} INTO {table_name} "
+            f"({', '.join(columns)}) VALUES "
+        )
+        # keep some room for the packet header and the server side parsing
+        budget = self.max_allowed_packet() - len(head) - len(on_duplicate) - 1024
+
+        statements: list[list[str]] = [[]]
+        size = 0
+        for row in values:
+            literal = self.connection.escape(tuple(row[col] for col in columns))  # type: ignore
+            literal_size = len(literal.encode()) + 2
+            if statements[-1] and size + literal_size > budget:
+                statements.append([])
+                size = 0
+            statements[-1].append(literal)
+            size += literal_size
+
+        affected = 0
+        for rows in statements:
+            query = head + ", ".join(rows) + on_duplicate + ";"
+            try:
+                affected += self.execute_rowcount(query=query, silent=True)
+            except MySqlWrongQueryError:
+                self.logger.warning(
+                    f"wrong query when inserting many, {traceback.format_exc()}"
+                )
+                raise
+            self.commit()
+        if not silent:
+            self.logger.debug(
+                f"MysqlClient inserted {len(values)} rows in {table_name} "
+                f"with {len(statements)} statements, {affected=}"
+            )
+        return affected
+
     def count(
         self,
         table_name: str,
@@ -323,8 +888,7 @@ class MysqlClient:
         MySqlWrongQueryError
             If query is wrong
         """
-        query = f"SELECT COUNT({', '.join(select_col) if select_col else '*'}) AS ct FROM {table_name} "
-        query = query + self.generate_cond(
+        cond_shape, args = self.generate_cond(
             cond_eq=cond_eq,
             cond_g=cond_g,
             cond_geq=cond_geq,
@@ -335,9 +899,13 @@ class MysqlClient:
             cond_not_null=cond_not_null,
             cond_null=cond_null,
         )
-        query = query + ";"
+        query = compile_count(
+            table_name=table_name,
+            select_col=tuple(select_col),
+            cond_shape=cond_shape,
+        )
 
-        res_mysql = self.execute(query=query, silent=silent)
+        res_mysql = self.execute(query=query, args=args, silent=silent)
         if not res_mysql:
             return None
         res = res_mysql[0].get("ct", None)
@@ -360,6 +928,10 @@ class MysqlClient:
         ascending_order: bool = True,
         limit: int = 0,
         offset: int = 0,
+        seek_col: list[str] = list(),
+        seek_after: list[object] = list(),
+        for_update: bool = False,
+        skip_locked: bool = False,
         silent: bool = False,
     ) -> tuple[dict[str, object], ...]:
         """Execute a SELECT query with various conditions.
@@ -394,6 +966,20 @@ class MysqlClient:
             Maximum number of rows to return, 0 means alls, by default 0
         offset : int | None, optional
             Number of rows to skip before returning results, 0 means no offset, by default 0
+        seek_col : list[str], optional
+            Keyset pagination columns, the rows are ordered by them (in
+            ascending_order direction) instead of order_by. They must identify a
+            row uniquely, e.g. ["committedDate", "id"]
+        seek_after : list[object], optional
+            Values of seek_col of the last row of the previous page, only rows
+            after it are returned. Empty for the first page
+        for_update : bool, optional
+            If True, lock the selected rows (SELECT ... FOR UPDATE) until the end of
+            the transaction, to be used inside transaction(). By default False
+        skip_locked : bool, optional
+            With for_update, skip the rows already locked by another transaction
+            instead of waiting for them (MySQL 8+), e.g. to claim queued jobs.
+            By default False
 
         Returns
         -------
@@ -407,10 +993,118 @@ class MysqlClient:
         MySqlWrongQueryError
             If query is wrong
         """
-        query = (
-            f"SELECT {', '.join(select_col) if select_col else '*'} FROM {table_name} "
+        cond_shape, args = self.generate_cond(
+            cond_eq=cond_eq,
+            cond_g=cond_g,
+            cond_geq=cond_geq,
+            cond_in=cond_in,
+            cond_l=cond_l,
+            cond_leq=cond_leq,
+            cond_neq=cond_neq,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+        )
+        if seek_after and len(seek_after) != len(seek_col):
+            raise MySqlWrongQueryError(f"{seek_after=} does not match {seek_col=}")
+        query = compile_select(
+            table_name=table_name,
+            select_col=tuple(select_col),
+            cond_shape=cond_shape,
+            order_by=order_by,
+            ascending_order=ascending_order,
+            paginated=bool(limit),
+            seek_col=tuple(seek_col),
+            seek=bool(seek_after),
+            for_update=for_update,
+            skip_locked=skip_locked,
         )
-        query = query + self.generate_cond(
+        if seek_after:
+            args = args + seek_args(seek_after)
+        if limit:
+            args = args + (limit, offset)
+
+        res_mysql = self.execute(query=query, args=args, silent=silent)
+        return res_mysql
+
+    def select_join(
+        self,
+        table_name: str,
+        joins: list[MySqlJoin] = list(),
+        select_col: list[str] = list(),
+        aggregates: list[MySqlAggregate] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_eq: dict[str, object] = dict(),
+        cond_neq: dict[str, object] = dict(),
+        cond_leq: dict[str, object] = dict(),
+        cond_geq: dict[str, object] = dict(),
+        cond_l: dict[str, object] = dict(),
+        cond_g: dict[str, object] = dict(),
+        group_by: list[str] = list(),
+        having_eq: dict[str, object] = dict(),
+        having_neq: dict[str, object] = dict(),
+        having_leq: dict[str, object] = dict(),
+        having_geq: dict[str, object] = dict(),
+        having_l: dict[str, object] = dict(),
+        having_g: dict[str, object] = dict(),
+        order_by: list[str] = list(),
+        ascending_order: bool | list[bool] = True,
+        limit: int = 0,
+        offset: int = 0,
+        silent: bool = False,
+    ) -> tuple[dict[str, object], ...]:
+        """Execute a SELECT query with joins, aggregates and grouping.
+
+        Columns should be qualified with their table name (or join alias) as soon
+        as a name is ambiguous between the joined tables.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table to query
+        joins : list[MySqlJoin], optional
+            Tables to join, in order
+        select_col : list[str], optional
+            List of columns to select, by default all columns if no aggregates
+        aggregates : list[MySqlAggregate], optional
+            Aggregates to select alongside select_col
+        cond_null, cond_not_null, cond_in, cond_eq, cond_neq : optional
+            WHERE conditions, same as in select
+        cond_leq, cond_geq, cond_l, cond_g : optional
+            WHERE conditions, same as in select
+        group_by : list[str], optional
+            Columns to group by
+        having_eq, having_neq, having_leq, having_geq, having_l, having_g : optional
+            HAVING conditions, keyed by aggregate alias
+        order_by : list[str], optional
+            Columns (or aggregate aliases) to order by
+        ascending_order : bool | list[bool], optional
+            Order direction, for all columns or one per order_by column
+        limit : int, optional
+            Maximum number of rows to return, 0 means all, by default 0
+        offset : int, optional
+            Number of rows to skip before returning results, by default 0
+        silent : bool, optional
+            If True, suppress logging of the query execution, by default False
+
+        Returns
+        -------
+        tuple
+            Query results as a tuple of dictionaries
+
+        Raises
+        ------
+        NoConnectionError
+            If no database connection exists
+        MySqlWrongQueryError
+            If query is wrong
+        """
+        if isinstance(ascending_order, bool):
+            ascending_order = [ascending_order] * len(order_by)
+        if len(ascending_order) != len(order_by):
+            raise MySqlWrongQueryError(f"{ascending_order=} does not match {order_by=}")
+        cond_shape, args = self.generate_cond(
             cond_eq=cond_eq,
             cond_g=cond_g,
             cond_geq=cond_geq,
@@ -421,18 +1115,146 @@ class MysqlClient:
             cond_not_null=cond_not_null,
             cond_null=cond_null,
         )
-        if order_by:
-            query = (
-                query + f" ORDER BY {order_by} {'ASC' if ascending_order else 'DESC'} "
-            )
+        having_shape, having_args = self.generate_cond(
+            cond_eq=having_eq,
+            cond_g=having_g,
+            cond_geq=having_geq,
+            cond_l=having_l,
+            cond_leq=having_leq,
+            cond_neq=having_neq,
+        )
+        query = compile_select_join(
+            table_name=table_name,
+            joins=tuple(joins),
+            select_col=tuple(select_col),
+            aggregates=tuple(aggregates),
+            cond_shape=cond_shape,
+            group_by=tuple(group_by),
+            having_shape=having_shape,
+            order_by=tuple(zip(order_by, ascending_order)),
+            paginated=bool(limit),
+        )
+        args = args + having_args
         if limit:
-            query = query + f" LIMIT {limit} "
-            query = query + f" OFFSET {offset} "
-        query = query + ";"
+            args = args + (limit, offset)
 
-        res_mysql = self.execute(query=query, silent=silent)
+        res_mysql = self.execute(query=query, args=args, silent=silent)
         return res_mysql
 
+    def select_iter(
+        self,
+        table_name: str,
+        select_col: list[str] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_eq: dict[str, object] = dict(),
+        cond_neq: dict[str, object] = dict(),
+        cond_leq: dict[str, object] = dict(),
+        cond_geq: dict[str, object] = dict(),
+        cond_l: dict[str, object] = dict(),
+        cond_g: dict[str, object] = dict(),
+        order_by: str = "",
+        ascending_order: bool = True,
+        seek_col: list[str] = list(),
+        seek_after: list[object] = list(),
+        batch_size: int = MYSQL_STREAM_BATCH_SIZE,
+        silent: bool = False,
+    ) -> Iterator[tuple[dict[str, object], ...]]:
+        """Stream a SELECT query through an unbuffered server-side cursor.
+
+        Rows are read from the socket batch by batch, so memory stays bounded by
+        `batch_size` whatever the size of the result. The connection cannot run
+        another query until the iterator is exhausted or closed. Closing it early
+        discards the connection rather than reading the rows left.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table to query
+        select_col : list[str], optional
+            List of columns to select, by default all columns
+        cond_null, cond_not_null, cond_in, cond_eq, cond_neq : optional
+            Conditions, same as in select
+        cond_leq, cond_geq, cond_l, cond_g : optional
+            Conditions, same as in select
+        order_by : str, optional
+            Column to order by, by default no order
+        ascending_order : bool, optional
+            Order direction, by default True
+        seek_col, seek_after : optional
+            Keyset ordering and starting point, same as in select
+        batch_size : int, optional
+            Number of rows fetched and yielded at once
+        silent : bool, optional
+            If True, suppress logging of the query execution, by default False
+
+        Yields
+        ------
+        tuple
+            Batches of at most `batch_size` rows, as dictionaries
+
+        Raises
+        ------
+        NoConnectionError
+            If no database connection exists
+        MySqlWrongQueryError
+            If query is wrong
+        """
+        if not self.connection:
+            self.logger.error("could not execute query, no connection to Database")
+            raise MySqlNoConnectionError()
+        cond_shape, args = self.generate_cond(
+            cond_eq=cond_eq,
+            cond_g=cond_g,
+            cond_geq=cond_geq,
+            cond_in=cond_in,
+            cond_l=cond_l,
+            cond_leq=cond_leq,
+            cond_neq=cond_neq,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+        )
+        if seek_after and len(seek_after) != len(seek_col):
+            raise MySqlWrongQueryError(f"{seek_after=} does not match {seek_col=}")
+        query = compile_select(
+            table_name=table_name,
+            select_col=tuple(select_col),
+            cond_shape=cond_shape,
+            order_by=order_by,
+            ascending_order=ascending_order,
+            paginated=False,
+            seek_col=tuple(seek_col),
+            seek=bool(seek_after),
+        )
+        if seek_after:
+            args = args + seek_args(seek_after)
+        cursor = self.connection.cursor(pymysql.cursors.SSDictCursor)
+        abandoned = False
+        try:
+            try:
+                cursor.execute(query=query, args=args)
+            except pymysql.err.ProgrammingError as e:
+                self.logger.warning(
+                    f"error while executing query, {traceback.format_exc()}"
+                )
+                raise MySqlWrongQueryError(f"{type(e)=}, {str(e)=}")
+            if not silent:
+                self.logger.debug(f"MysqlClient streaming: {str(cursor._executed)}")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield tuple(rows)
+        except GeneratorExit:
+            # closing the cursor would read every row left, drop the connection
+            abandoned = True
+            self.discard_connection()
+            raise
+        finally:
+            if not abandoned:
+                cursor.close()
+
     def select_by_id(
         self,
         table_name: str,
@@ -501,19 +1323,44 @@ class MysqlClient:
         """
         try:
             res_mysql = self.delete(
-                table_name=table_name, cond_eq={"id": id}, silent=silent
+                table_name=table_name,
+                cond_eq={"id": id},
+                silent=silent,
+                return_rows=True,
             )
         except MySqlWrongQueryError as e:
             self.logger.warning(
                 f"wrong query when deleting by id, {traceback.format_exc()}"
             )
             raise e
-        self.connection.commit()  # type: ignore
-        return res_mysql[0] if res_mysql else dict()
+        return res_mysql[0] if res_mysql else dict()  # type: ignore
+
+    def discard_connection(self):
+        """Close the connection without reading what the server still sends.
+
+        The pool slot is released, a later call checks out a new connection.
+        """
+        if not self.connection:
+            return
+        connection, self.connection = self.connection, None
+        self.transaction_depth = 0
+        if self.pool:
+            self.pool.discard(connection)
+        else:
+            try:
+                connection.close()
+            except pymysql.err.Error:
+                pass
 
     def close(self):
-        if self.connection:
+        if not self.connection:
+            return
+        self.transaction_depth = 0
+        if self.pool:
+            self.pool.checkin(self.connection)
+        else:
             self.connection.close()
+        self.connection = None
 
     def insert_one(
         self,
@@ -562,7 +1409,110 @@ class MysqlClient:
                 f"wrong query when inserting one, {traceback.format_exc()}"
             )
             raise
-        self.connection.commit()  # type: ignore
+        self.commit()
+
+    def insert_many(
+        self,
+        table_name: str,
+        values: list[dict[str, object]],
+        silent=False,
+        or_ignore=False,
+    ) -> int:
+        """Insert rows with multi-row INSERT statements.
+
+        Rows are packed in as few statements as `max_allowed_packet` allows, and
+        each statement is committed once.
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table to insert into
+        values : list[dict[str, object]]
+            Rows to insert, all with the same columns
+        silent : bool, optional
+            If True, suppress logging of the query execution, by default False
+        or_ignore : bool, optional
+            If True, use INSERT IGNORE, default False
+
+        Returns
+        -------
+        int
+            Number of inserted rows
+
+        Raises
+        ------
+        NoValueInsertionError
+            If values is empty
+        MySqlInconsistentColumnsError
+            If the rows do not all have the same columns
+        NoConnectionError
+            If no database connection exists
+        MySqlWrongQueryError
+            If query is wrong
+        """
+        if not values or not values[0]:
+            self.logger.warning("could not insert many, no values given")
+            raise MySqlNoValueInsertionError()
+        return self.__insert_rows(
+            table_name=table_name,
+            values=values,
+            or_ignore=or_ignore,
+            on_duplicate="",
+            silent=silent,
+        )
+
+    def upsert_many(
+        self,
+        table_name: str,
+        values: list[dict[str, object]],
+        update_col: list[str] = list(),
+        silent=False,
+    ) -> int:
+        """Insert rows, updating the existing ones (INSERT ... ON DUPLICATE KEY UPDATE).
+
+        Parameters
+        ----------
+        table_name : str
+            Name of the table to insert into
+        values : list[dict[str, object]]
+            Rows to insert, all with the same columns
+        update_col : list[str], optional
+            Columns to overwrite on existing rows, by default all columns but id
+        silent : bool, optional
+            If True, suppress logging of the query execution, by default False
+
+        Returns
+        -------
+        int
+            Affected rows as reported by MySQL: 1 per inserted row, 2 per updated
+            row and 0 per row left unchanged
+
+        Raises
+        ------
+        NoValueInsertionError
+            If values is empty
+        MySqlInconsistentColumnsError
+            If the rows do not all have the same columns
+        NoConnectionError
+            If no database connection exists
+        MySqlWrongQueryError
+            If query is wrong
+        """
+        if not values or not values[0]:
+            self.logger.warning("could not upsert many, no values given")
+            raise MySqlNoValueInsertionError()
+        if not update_col:
+            update_col = [col for col in values[0] if col != "id"]
+        on_duplicate = " ON DUPLICATE KEY UPDATE " + ", ".join(
+            [f"{col} = VALUES({col})" for col in update_col] or ["id = id"]
+        )
+        return self.__insert_rows(
+            table_name=table_name,
+            values=values,
+            or_ignore=False,
+            on_duplicate=on_duplicate,
+            silent=silent,
+        )
 
     def update(
         self,
@@ -579,7 +1529,8 @@ class MysqlClient:
         cond_l: dict[str, object] = dict(),
         cond_g: dict[str, object] = dict(),
         silent: bool = False,
-    ) -> tuple[dict[str, object], ...]:
+        return_rows: bool = False,
+    ) -> tuple[dict[str, object], ...] | int:
         """Update rows in a database table based on conditions.
 
         Parameters
@@ -610,11 +1561,17 @@ class MysqlClient:
             Column values that must be greater than given value
         silent : bool, optional
             If True, suppress logging of the query execution, by default False
+        return_rows : bool, optional
+            If True, return the updated rows. This costs a select of the matching
+            ids before the update and a select of the rows after it, by default
+            False, which runs a single UPDATE statement
 
         Returns
         -------
+        int
+            Number of updated rows, if return_rows is False
         tuple
-            Updated rows' data
+            Updated rows' data, if return_rows is True
 
         Raises
         ------
@@ -635,6 +1592,35 @@ class MysqlClient:
             if col in update_col_col:
                 raise (MySqlDuplicateColumnUpdateError(column=col))
 
+        if not return_rows:
+            cond_shape, args = self.generate_cond(
+                cond_eq=cond_eq,
+                cond_g=cond_g,
+                cond_geq=cond_geq,
+                cond_in=cond_in,
+                cond_l=cond_l,
+                cond_leq=cond_leq,
+                cond_neq=cond_neq,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+            )
+            query = compile_update(
+                table_name=table_name,
+                update_col_col=tuple(update_col_col.items()),
+                update_value_col=tuple(update_col_value),
+                cond_shape=cond_shape,
+            )
+            args = tuple(update_col_value.values()) + args
+            try:
+                updated = self.execute_rowcount(query=query, args=args, silent=silent)
+            except MySqlWrongQueryError as e:
+                self.logger.warning(
+                    f"wrong query when updating, {traceback.format_exc()}"
+                )
+                raise e
+            self.commit()
+            return updated
+
         try:
             ids_to_update = self.select(
                 table_name=table_name,
@@ -660,20 +1646,20 @@ class MysqlClient:
             self.logger.info("nothing to update")
             return tuple()
 
-        for col in update_col_value:
-            update_col_value[col] = self.obj_to_str(update_col_value[col])
-
-        query = f"UPDATE {table_name} SET "
-        update_col = update_col_col | update_col_value
-        update_ls = [f" {col} = {update_col[col]} " for col in update_col]
-        query = query + f" {', '.join(update_ls)} "
-        query = query + f""" WHERE id IN ('{"', '".join(ids_to_update_ls)}')"""
+        cond_shape, args = self.generate_cond(cond_in={"id": ids_to_update_ls})
+        query = compile_update(
+            table_name=table_name,
+            update_col_col=tuple(update_col_col.items()),
+            update_value_col=tuple(update_col_value),
+            cond_shape=cond_shape,
+        )
+        args = tuple(update_col_value.values()) + args
         try:
-            self.execute(query=query, silent=silent)
+            self.execute(query=query, args=args, silent=silent)
         except MySqlWrongQueryError as e:
             self.logger.warning(f"wrong query when updating, {traceback.format_exc()}")
             raise e
-        self.connection.commit()  # type: ignore
+        self.commit()
 
         return self.select(table_name=table_name, cond_in={"id": ids_to_update_ls})
 
@@ -713,16 +1699,241 @@ class MysqlClient:
                 update_col_value={k: v for (k, v) in values.items() if k != "id"},
                 cond_eq={"id": id},
                 silent=silent,
+                return_rows=True,
             )
         except MySqlWrongQueryError as e:
             self.logger.warning(
                 f"wrong query when updating by id, {traceback.format_exc()}"
             )
             raise e
-        return mysql_res[0] if mysql_res else dict()
+        return mysql_res[0] if mysql_res else dict()  # type: ignore
 
     def id_exists(self, table_name: str, id: str, silent: bool = False) -> bool:
         res = self.select_by_id(table_name=table_name, id=id, silent=silent)
         if res:
             return True
         return False
+
+
+_mysql_executor: ThreadPoolExecutor | None = None
+_mysql_checkout_executor: ThreadPoolExecutor | None = None
+_mysql_executor_pid: int | None = None
+
+
+def _get_executors() -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+    global _mysql_executor, _mysql_checkout_executor, _mysql_executor_pid
+    with _mysql_pool_lock:
+        if (
+            _mysql_executor is None
+            or _mysql_checkout_executor is None
+            or _mysql_executor_pid != os.getpid()
+        ):
+            _mysql_executor = ThreadPoolExecutor(
+                max_workers=MYSQL_EXECUTOR_MAX_WORKERS, thread_name_prefix="mysql"
+            )
+            # more threads waiting on the pool than it has connections is useless
+            _mysql_checkout_executor = ThreadPoolExecutor(
+                max_workers=MYSQL_POOL_MAX_SIZE, thread_name_prefix="mysql_checkout"
+            )
+            _mysql_executor_pid = os.getpid()
+        return _mysql_executor, _mysql_checkout_executor
+
+
+def get_mysql_executor() -> ThreadPoolExecutor:
+    """Return the bounded executor running the blocking queries of this worker."""
+    return _get_executors()[0]
+
+
+def get_mysql_checkout_executor() -> ThreadPoolExecutor:
+    """Return the executor waiting for pooled connections for this worker.
+
+    It is kept apart from the query executor: threads blocked on an exhausted pool
+    would otherwise take the threads the connection holders need to run their
+    queries and give their connection back.
+    """
+    return _get_executors()[1]
+
+
+def close_mysql_executor():
+    global _mysql_executor, _mysql_checkout_executor
+    with _mysql_pool_lock:
+        if _mysql_executor_pid == os.getpid():
+            for executor in (_mysql_checkout_executor, _mysql_executor):
+                if executor is not None:
+                    executor.shutdown(wait=True)
+        _mysql_executor = None
+        _mysql_checkout_executor = None
+
+
+class AsyncMysqlClient:
+    """Awaitable counterpart of MysqlClient.
+
+    Every call is run on the worker's bounded executor, so pymysql I/O never blocks
+    the event loop and one worker can have many requests waiting on the database.
+    Waiting for a pooled connection happens on a separate executor, so requests
+    queued on an exhausted pool never hold up the queries of the ones served.
+    The client still owns a single connection: its calls must be awaited one after
+    the other, never gathered.
+    """
+
+    def __init__(
+        self, mysql_client: MysqlClient, executor: ThreadPoolExecutor | None = None
+    ):
+        self.mysql_client = mysql_client
+        self.logger = mysql_client.logger
+        self.executor = executor if executor else get_mysql_executor()
+        # the last call, it keeps running on its thread if its caller is cancelled
+        self._running: asyncio.Future | None = None
+
+    @classmethod
+    async def connect(
+        cls, logger: Logger | None = None, pool: MysqlConnectionPool | None = None
+    ) -> "AsyncMysqlClient":
+        """Check out a connection, waiting on the checkout executor."""
+        checkout = get_mysql_checkout_executor().submit(
+            partial(MysqlClient, logger=logger, pool=pool)
+        )
+        try:
+            mysql_client = await asyncio.wrap_future(checkout)
+        except asyncio.CancelledError:
+            # a checkout already waiting on the pool can not be interrupted, give
+            # its connection back once it gets one
+            checkout.add_done_callback(
+                lambda f: f.cancelled() or f.exception() or f.result().close()
+            )
+            raise
+        return cls(mysql_client=mysql_client, executor=get_mysql_executor())
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run `func` on the executor, once the previous call is over.
+
+        A cancelled caller leaves its call running on its thread, the next call
+        waits for it rather than using the connection at the same time.
+        """
+        await self.__settle()
+        self._running = asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(func, *args, **kwargs)
+        )
+        return await asyncio.shield(self._running)
+
+    async def __settle(self):
+        if self._running is not None and not self._running.done():
+            await asyncio.wait([self._running])
+
+    async def close(self):
+        await self.run(self.mysql_client.close)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AsyncMysqlClient"]:
+        """Async counterpart of MysqlClient.transaction.
+
+        A scope cancelled in the middle of a statement rolls back once that
+        statement is over, run waits for it.
+        """
+        await self.run(self.mysql_client.begin_transaction)
+        try:
+            yield self
+        except BaseException:
+            await self.run(self.mysql_client.end_transaction, rollback=True)
+            raise
+        await self.run(self.mysql_client.end_transaction)
+
+    async def execute(
+        self, query: str, args: tuple | dict | None = None, silent=False
+    ) -> tuple[dict[str, object], ...]:
+        return await self.run(
+            self.mysql_client.execute, query=query, args=args, silent=silent
+        )
+
+    async def count(self, table_name: str, **kwargs) -> int | None:
+        return await self.run(self.mysql_client.count, table_name, **kwargs)
+
+    async def select(self, table_name: str, **kwargs) -> tuple[dict[str, object], ...]:
+        return await self.run(self.mysql_client.select, table_name, **kwargs)
+
+    async def select_join(
+        self, table_name: str, **kwargs
+    ) -> tuple[dict[str, object], ...]:
+        return await self.run(self.mysql_client.select_join, table_name, **kwargs)
+
+    async def select_iter(
+        self, table_name: str, **kwargs
+    ) -> AsyncIterator[tuple[dict[str, object], ...]]:
+        batches = self.mysql_client.select_iter(table_name, **kwargs)
+        try:
+            while True:
+                batch = await self.run(next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            await self.run(batches.close)
+
+    async def select_by_id(self, table_name: str, id: str, **kwargs) -> dict:
+        return await self.run(self.mysql_client.select_by_id, table_name, id, **kwargs)
+
+    async def id_exists(self, table_name: str, id: str, silent: bool = False) -> bool:
+        return await self.run(
+            self.mysql_client.id_exists, table_name, id, silent=silent
+        )
+
+    async def insert_one(self, table_name: str, values: dict[str, object], **kwargs):
+        return await self.run(
+            self.mysql_client.insert_one, table_name, values, **kwargs
+        )
+
+    async def insert_many(
+        self, table_name: str, values: list[dict[str, object]], **kwargs
+    ) -> int:
+        return await self.run(
+            self.mysql_client.insert_many, table_name, values, **kwargs
+        )
+
+    async def upsert_many(
+        self, table_name: str, values: list[dict[str, object]], **kwargs
+    ) -> int:
+        return await self.run(
+            self.mysql_client.upsert_many, table_name, values, **kwargs
+        )
+
+    async def update(
+        self, table_name: str, **kwargs
+    ) -> tuple[dict[str, object], ...] | int:
+        return await self.run(self.mysql_client.update, table_name, **kwargs)
+
+    async def update_by_id(
+        self, table_name: str, id: str, values: dict[str, object], silent=False
+    ) -> dict:
+        return await self.run(
+            self.mysql_client.update_by_id, table_name, id, values, silent=silent
+        )
+
+    async def delete(
+        self, table_name: str, **kwargs
+    ) -> tuple[dict[str, object], ...] | int:
+        return await self.run(self.mysql_client.delete, table_name, **kwargs)
+
+    async def delete_by_id(
+        self, table_name: str, id: str, silent: bool = False
+    ) -> dict:
+        return await self.run(
+            self.mysql_client.delete_by_id, table_name, id, silent=silent
+        )
+
+
+@asynccontextmanager
+async def pooled_async_mysql_client() -> AsyncIterator[AsyncMysqlClient]:
+    """Lend a pooled AsyncMysqlClient for the scope."""
+    mysql_client = await AsyncMysqlClient.connect(
+        logger=base_logger, pool=get_mysql_pool()
+    )
+    try:
+        yield mysql_client
+    finally:
+        await mysql_client.close()
+
+
+async def get_async_mysql_client() -> AsyncIterator[AsyncMysqlClient]:
+    """FastAPI dependency lending a pooled AsyncMysqlClient for the request."""
+    async with pooled_async_mysql_client() as mysql_client:
+        yield mysql_client
@@ -1,8 +1,46 @@
+import asyncio
+import copy
+import heapq
+import itertools
+import json
+import random
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from importlib.util import find_spec
 from logging import Logger
 
-from requests import Session
+import httpx
 
-from _config import GITHUB_TOKEN, base_logger
+from _config import (
+    GITHUB_API_URL,
+    GITHUB_BACKGROUND_RESERVE,
+    GITHUB_BACKOFF_BASE,
+    GITHUB_BACKOFF_MAX,
+    GITHUB_BREAKER_FAILURE_THRESHOLD,
+    GITHUB_BREAKER_RESET_TIMEOUT,
+    GITHUB_CACHE_MAX_SIZE,
+    GITHUB_CONNECT_TIMEOUT,
+    GITHUB_HTTP2,
+    GITHUB_MAX_CONNECTIONS,
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+    GITHUB_MAX_RETRIES,
+    GITHUB_RATE_LIMIT_POINTS,
+    GITHUB_READ_TIMEOUT,
+    GITHUB_TOKEN_COOLDOWN,
+    GITHUB_TOKENS,
+    DateTimeFormat,
+    base_logger,
+)
+
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+RATE_LIMIT_STATUS_CODES = (403, 429)
+# aliased so it can not clash with a rateLimit field of the caller's query
+RATE_LIMIT_ALIAS = "clientRateLimit"
+# most ids Github accepts in a single nodes(ids:) call
+NODES_BATCH_SIZE = 100
+RATE_LIMIT_FIELD = f"{RATE_LIMIT_ALIAS}: rateLimit {{ cost limit remaining resetAt }}"
 
 
 class GithubServerError(Exception):
@@ -15,32 +53,668 @@ class GithubNoDataResponseError(Exception):
         super().__init__(f"got no data response {detail}")
 
 
+class GithubCircuitOpenError(GithubServerError):
+    def __init__(self) -> None:
+        super().__init__("circuit breaker is open, Github is considered degraded")
+
+
+class GithubNoTokenError(GithubServerError):
+    def __init__(self) -> None:
+        super().__init__("no usable Github token left")
+
+
+class GithubTokenNotSetError(Exception):
+    def __init__(self) -> None:
+        super().__init__(
+            "no Github token configured, set GITHUB_TOKEN or GITHUB_TOKENS"
+        )
+
+
+class CircuitState:
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class GithubPriority:
+    interactive = 0
+    background = 1
+
+
+class GithubCircuitBreaker:
+    """Fail fast while Github keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    rejected for `reset_timeout` seconds. Then a single probe call is let through:
+    its success closes the circuit, its failure opens it again. A probe with no
+    outcome after another `reset_timeout`, cancelled or failed on something not
+    recorded, is given up and a new one let through.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = GITHUB_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = GITHUB_BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.closed:
+            return True
+        if self.state == CircuitState.open:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.half_open
+            self.probe_started_at = time.monotonic()
+            return True
+        # half open, the probe call is still running unless it was lost
+        if time.monotonic() - self.probe_started_at < self.reset_timeout:
+            return False
+        self.probe_started_at = time.monotonic()
+        return True
+
+    def record_success(self):
+        self.state = CircuitState.closed
+        self.failures = 0
+
+    def record_abort(self):
+        """A call ended with no outcome, if it was the probe let another one go."""
+        if self.state == CircuitState.half_open:
+            self.probe_started_at = float("-inf")
+
+    def record_failure(self):
+        self.failures += 1
+        if (
+            self.state == CircuitState.half_open
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state != CircuitState.open:
+                self.times_opened += 1
+            self.state = CircuitState.open
+            self.opened_at = time.monotonic()
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class GithubRateLimiter:
+    """Token bucket over Github's GraphQL point budget.
+
+    The bucket holds the points Github last reported as remaining and is refilled
+    to the full limit at resetAt. A call takes its cost from the bucket before
+    being sent; when it can not, it waits in a priority queue until points come
+    back. Background calls also leave `background_reserve` points untouched, so
+    interactive requests keep working while a backfill drains the budget.
+    """
+
+    def __init__(
+        self,
+        limit: int = GITHUB_RATE_LIMIT_POINTS,
+        background_reserve: int = GITHUB_BACKGROUND_RESERVE,
+    ) -> None:
+        self.limit = limit
+        self.remaining = float(limit)
+        self.reset_at: float | None = None
+        self.background_reserve = background_reserve
+        self.last_cost = 0
+        self._waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.counters = {"granted": 0, "delayed": 0, "waited_seconds": 0.0}
+
+    def available(self) -> float:
+        self.__refill()
+        return self.remaining
+
+    def exhaust(self, delay: float):
+        """Github refused a call, keep the bucket empty for `delay` seconds."""
+        self.remaining = 0.0
+        self.reset_at = max(self.reset_at or 0.0, time.time() + delay)
+        self.__schedule_wakeup()
+
+    def __refill(self):
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            self.remaining = float(self.limit)
+            self.reset_at = None
+
+    def __can_take(self, cost: float, priority: int) -> bool:
+        reserve = (
+            self.background_reserve if priority > GithubPriority.interactive else 0
+        )
+        return self.remaining - cost >= reserve
+
+    def __wake(self):
+        """Grant waiting calls in priority order while the budget allows it."""
+        self._wakeup = None
+        self.__refill()
+        while self._waiters:
+            priority, _, cost, waiter = self._waiters[0]
+            if waiter.done():
+                # cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if not self.__can_take(cost, priority):
+                break
+            heapq.heappop(self._waiters)
+            self.remaining -= cost
+            waiter.set_result(None)
+        self.__schedule_wakeup()
+
+    def __schedule_wakeup(self):
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        if not self._waiters:
+            return
+        # without a known reset time, check again once Github's hourly window
+        # has surely moved
+        delay = self.reset_at - time.time() if self.reset_at is not None else 60.0
+        self._wakeup = asyncio.get_running_loop().call_later(
+            max(delay, 0.0), self.__wake
+        )
+
+    async def acquire(
+        self, cost: float = 1, priority: int = GithubPriority.interactive
+    ):
+        self.__refill()
+        if not self._waiters and self.__can_take(cost, priority):
+            self.remaining -= cost
+            self.counters["granted"] += 1
+            return
+
+        # queued calls of a lower priority, such as background calls held back
+        # by the reserve, must not hold this one up
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), cost, waiter))
+        self.__wake()
+        if waiter.done():
+            self.counters["granted"] += 1
+            return
+
+        self.counters["delayed"] += 1
+        start = time.monotonic()
+        try:
+            await waiter
+        finally:
+            self.counters["waited_seconds"] += time.monotonic() - start
+        self.counters["granted"] += 1
+
+    def update(self, rate_limit: dict[str, object]):
+        """Sync the bucket with the rateLimit object Github sent back."""
+        try:
+            self.limit = int(rate_limit["limit"])  # type: ignore
+            self.remaining = float(rate_limit["remaining"])  # type: ignore
+            self.last_cost = int(rate_limit["cost"])  # type: ignore
+            self.reset_at = (
+                datetime.strptime(str(rate_limit["resetAt"]), DateTimeFormat.github)
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            )
+        except (KeyError, TypeError, ValueError):
+            return
+        self.__wake()
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            **self.counters,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "last_cost": self.last_cost,
+            "waiting": len(self._waiters),
+        }
+
+
+class GithubToken:
+    """A token with its own rate limit bucket and health."""
+
+    def __init__(self, token: str, name: str) -> None:
+        self.token = token
+        self.name = name
+        self.rate_limiter = GithubRateLimiter()
+        self.disabled_until = 0.0
+        self.requests = 0
+        self.rate_limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return time.monotonic() >= self.disabled_until
+
+    def disable(self, cooldown: float = GITHUB_TOKEN_COOLDOWN):
+        """Skip the token for `cooldown` seconds, a refusal may be transient."""
+        self.disabled_until = time.monotonic() + cooldown
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            **self.rate_limiter.metrics(),
+        }
+
+
+class GithubTokenPool:
+    """Spread calls across several tokens.
+
+    Each call goes to the enabled token with the most remaining points, ties
+    going to the one whose budget resets first. Tokens Github refuses (401) are
+    disabled for GITHUB_TOKEN_COOLDOWN, then tried again; exhausted ones are
+    skipped until they reset.
+    """
+
+    def __init__(self, tokens: list[str]) -> None:
+        if not tokens:
+            raise GithubTokenNotSetError()
+        self.tokens = [
+            GithubToken(token=token, name=f"token_{i}")
+            for i, token in enumerate(tokens)
+        ]
+
+    def enabled(self) -> list[GithubToken]:
+        return [token for token in self.tokens if token.enabled]
+
+    def has_available(self, cost: float = 1) -> bool:
+        return any(token.rate_limiter.available() >= cost for token in self.enabled())
+
+    async def acquire(
+        self, cost: float = 1, priority: int = GithubPriority.interactive
+    ) -> GithubToken:
+        candidates = self.enabled()
+        if not candidates:
+            raise GithubNoTokenError()
+        token = max(
+            candidates,
+            key=lambda t: (t.rate_limiter.available(), -(t.rate_limiter.reset_at or 0)),
+        )
+        await token.rate_limiter.acquire(cost=cost, priority=priority)
+        token.requests += 1
+        return token
+
+    def metrics(self) -> dict[str, object]:
+        return {token.name: token.metrics() for token in self.tokens}
+
+
+class GithubResponseCache:
+    """TTL and size bounded LRU cache of query data.
+
+    Entries are keyed by the query with its whitespace collapsed and by the
+    variables with sorted keys.
+    """
+
+    def __init__(self, max_size: int = GITHUB_CACHE_MAX_SIZE) -> None:
+        self.max_size = max_size
+        # key -> (expires at, data)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(query: str, variables: dict[str, object] | None) -> tuple[str, str]:
+        return (
+            re.sub(r"\s+", " ", query).strip(),
+            json.dumps(variables or {}, sort_keys=True, default=str),
+        )
+
+    def get(self, key: tuple[str, str]) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: tuple[str, str], data: dict, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(data))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def discard(self, key: tuple[str, str]):
+        self._entries.pop(key, None)
+
+    def metrics(self) -> dict[str, object]:
+        return {**self.counters, "size": len(self._entries)}
+
+
+class GithubNodeLoader:
+    """Batch node lookups into nodes(ids:) queries.
+
+    Every id asked for during the same event loop tick is resolved by a single
+    query per NODES_BATCH_SIZE ids, selecting `fragment` on each node. Each
+    caller gets back its own node, None when Github could not resolve it.
+    Github answers a batch with one unresolvable id without any data, so a batch
+    that gets no nodes back is retried one id at a time. Get loaders from
+    GithubClient.node_loader so the ones sharing a fragment also share their
+    batches.
+    """
+
+    def __init__(
+        self,
+        client: "GithubClient",
+        fragment: str,
+        priority: int = GithubPriority.interactive,
+    ) -> None:
+        self.client = client
+        self.fragment = fragment
+        self.priority = priority
+        self.query = "query ($ids: [ID!]!) { nodes(ids: $ids) { " + fragment + " } }"
+        self._pending: dict[str, asyncio.Future] = dict()
+        self.counters = {"loads": 0, "batches": 0, "fallbacks": 0}
+
+    async def load(self, node_id: str) -> dict | None:
+        self.counters["loads"] += 1
+        waiter = self._pending.get(node_id)
+        if waiter is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self.__dispatch)
+            waiter = loop.create_future()
+            self._pending[node_id] = waiter
+        return await asyncio.shield(waiter)
+
+    async def load_many(self, node_ids: list[str]) -> list[dict | None]:
+        return list(await asyncio.gather(*(self.load(i) for i in node_ids)))
+
+    def __dispatch(self):
+        pending, self._pending = self._pending, dict()
+        node_ids = list(pending)
+        for i in range(0, len(node_ids), NODES_BATCH_SIZE):
+            batch = {
+                node_id: pending[node_id]
+                for node_id in node_ids[i : i + NODES_BATCH_SIZE]
+            }
+            asyncio.get_running_loop().create_task(self.__fetch(batch))
+
+    async def __fetch_nodes(self, node_ids: list[str]) -> list[dict | None]:
+        data = await self.client.graphql_post(
+            query=self.query,
+            variables={"ids": node_ids},
+            priority=self.priority,
+            silent=True,
+        )
+        nodes = (data or dict()).get("nodes")
+        if nodes is None:
+            raise GithubNoDataResponseError(detail=f"no nodes for {node_ids=}")
+        return nodes
+
+    async def __fetch(self, batch: dict[str, asyncio.Future]):
+        self.counters["batches"] += 1
+        try:
+            nodes = await self.__fetch_nodes(list(batch))
+        except GithubNoDataResponseError:
+            if len(batch) == 1:
+                nodes = [None]
+            else:
+                self.counters["fallbacks"] += 1
+                await asyncio.gather(
+                    *(
+                        self.__fetch({node_id: waiter})
+                        for node_id, waiter in batch.items()
+                    )
+                )
+                return
+        except Exception as e:
+            for waiter in batch.values():
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+
+        for node_id, node in zip(batch, nodes):
+            if not batch[node_id].done():
+                batch[node_id].set_result(node)
+
+    def metrics(self) -> dict[str, object]:
+        return dict(self.counters)
+
+
+def with_rate_limit(query: str) -> str:
+    """Add the rateLimit field to a query, mutations are returned unchanged."""
+    stripped = query.lstrip()
+    if not stripped.startswith(("query", "{")) or RATE_LIMIT_ALIAS in query:
+        return query
+    brace = query.find("{")
+    return query[: brace + 1] + f"\n    {RATE_LIMIT_FIELD}" + query[brace + 1 :]
+
+
 class GithubClient:
-    def __init__(self, logger: Logger | None = None, token: str | None = None) -> None:
+    """Async Github GraphQL client.
+
+    The underlying httpx client keeps a bounded pool of keep-alive connections,
+    so a client should be shared by the whole worker (see get_github_client)
+    rather than built per request. Concurrent graphql_post calls are fine.
+    """
+
+    def __init__(
+        self,
+        logger: Logger | None = None,
+        token: str | None = None,
+        tokens: list[str] | None = None,
+        url: str | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.logger = logger if logger else base_logger
-        self.session = Session()
-        self.token = token if token else GITHUB_TOKEN
+        if token:
+            tokens = [token]
+        self.tokens = GithubTokenPool(tokens if tokens else GITHUB_TOKENS)
+        self.url = url if url else GITHUB_API_URL
         self.date_format = "%Y-%m-%dT%H:%M:%SZ"
+        self.http_client = http_client if http_client else self.__new_http_client()
+        self.timeout = httpx.Timeout(
+            GITHUB_READ_TIMEOUT, connect=GITHUB_CONNECT_TIMEOUT
+        )
+        self.max_retries = GITHUB_MAX_RETRIES
+        self.backoff_base = GITHUB_BACKOFF_BASE
+        self.backoff_max = GITHUB_BACKOFF_MAX
+        self.breaker = GithubCircuitBreaker()
+        self.cache = GithubResponseCache()
+        self._node_loaders: dict[tuple[str, int], GithubNodeLoader] = dict()
+        self.counters = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "rate_limited": 0,
+            "unauthorized": 0,
+            "circuit_open_rejections": 0,
+        }
+
+    def __new_http_client(self) -> httpx.AsyncClient:
+        http2 = GITHUB_HTTP2
+        if http2 and find_spec("h2") is None:
+            self.logger.warning("GITHUB_HTTP2 is set but h2 is not installed")
+            http2 = False
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=GITHUB_MAX_CONNECTIONS,
+                max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+
+    async def close(self):
+        await self.http_client.aclose()
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            **self.counters,
+            "circuit": self.breaker.metrics(),
+            "tokens": self.tokens.metrics(),
+            "cache": self.cache.metrics(),
+            "node_loaders": {
+                f"{fragment!r}, {priority=}": loader.metrics()
+                for (fragment, priority), loader in self._node_loaders.items()
+            },
+        }
+
+    def __backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    def __retry_after(resp: httpx.Response) -> float | None:
+        retry_after = resp.headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            return None
+
+    def __rate_limit_delay(self, resp: httpx.Response) -> float | None:
+        """Seconds Github asks us to wait, None if resp is not a rate limit."""
+        if resp.status_code not in RATE_LIMIT_STATUS_CODES:
+            return None
+        retry_after = self.__retry_after(resp)
+        if retry_after is not None:
+            return retry_after
+        if resp.headers.get("x-ratelimit-remaining") == "0":
+            try:
+                reset_at = float(resp.headers["x-ratelimit-reset"])
+            except (KeyError, ValueError):
+                return None
+            return max(reset_at - time.time(), 0.0)
+        if "secondary rate limit" in resp.text.lower():
+            # Github documents waiting at least one minute without retry-after
+            return 60.0
+        return None
+
+    async def __post(
+        self,
+        payload: dict[str, object],
+        cost: float,
+        priority: int,
+        silent=False,
+    ) -> tuple[httpx.Response, GithubToken]:
+        message = ""
+        for attempt in range(self.max_retries + 1):
+            # checked first, a rejected call neither spends nor waits for points
+            if not self.breaker.allow():
+                self.counters["circuit_open_rejections"] += 1
+                raise GithubCircuitOpenError()
+            try:
+                token = await self.tokens.acquire(cost=cost, priority=priority)
+                self.counters["requests"] += 1
+                headers = {"Authorization": f"token {token.token}"}
+                resp = await self.http_client.post(
+                    url=self.url, headers=headers, json=payload, timeout=self.timeout
+                )
+            except httpx.TimeoutException as e:
+                self.counters["timeouts"] += 1
+                self.breaker.record_failure()
+                message = f"timed out reaching Github : {type(e)=}, {str(e)=}."
+                delay = self.__backoff(attempt)
+            except httpx.HTTPError as e:
+                self.breaker.record_failure()
+                message = f"could not reach Github : {type(e)=}, {str(e)=}."
+                delay = self.__backoff(attempt)
+            except BaseException:
+                # cancelled, out of tokens, or failed before reaching Github
+                self.breaker.record_abort()
+                raise
+            else:
+                rate_limit_delay = self.__rate_limit_delay(resp)
+                if rate_limit_delay is not None:
+                    self.counters["rate_limited"] += 1
+                    token.rate_limited += 1
+                    token.rate_limiter.exhaust(rate_limit_delay)
+                    self.breaker.record_success()
+                    message = (
+                        f"rate limited by Github {resp.status_code=}, {token.name=}."
+                    )
+                    # another token may still have budget left
+                    delay = 0.0 if self.tokens.has_available(cost) else rate_limit_delay
+                elif resp.status_code == 401:
+                    self.counters["unauthorized"] += 1
+                    token.disable()
+                    self.breaker.record_success()
+                    message = f"Github refused {token.name=}, disabling it for a while."
+                    self.logger.warning(message)
+                    if not self.tokens.enabled():
+                        raise GithubNoTokenError()
+                    delay = 0.0
+                elif resp.status_code in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_failure()
+                    message = f"could not get response from Github {resp.status_code=}."
+                    retry_after = self.__retry_after(resp)
+                    delay = (
+                        retry_after
+                        if retry_after is not None
+                        else self.__backoff(attempt)
+                    )
+                else:
+                    self.breaker.record_success()
+                    return resp, token
+
+            if attempt == self.max_retries or delay > self.backoff_max:
+                break
+            self.counters["retries"] += 1
+            if not silent:
+                self.logger.debug(f"{message} retrying in {delay:.2f}s, {attempt=}")
+            await asyncio.sleep(delay)
 
-    def close(self):
-        self.session.close()
+        self.counters["failures"] += 1
+        self.logger.warning(message)
+        raise GithubServerError(detail=message)
+
+    async def graphql_post(
+        self,
+        query: str,
+        variables: dict[str, object] | None = None,
+        silent=False,
+        priority: int = GithubPriority.interactive,
+        cost: float = 1,
+        cache_ttl: float | None = None,
+    ) -> dict:
+        """Post a query and return its data.
+
+        The call first waits for `cost` points from the token with the most budget
+        left, background calls (see GithubPriority) giving way to interactive ones.
+        The rateLimit field is added to queries so each token's bucket follows
+        Github's own count, it is removed from the returned data.
+
+        With `cache_ttl`, data is served from the response cache for that many
+        seconds. Only use it for data that rarely changes.
+        """
+        cache_key = GithubResponseCache.key(query, variables) if cache_ttl else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if not silent:
+                    self.logger.debug(f"got from cache {query=}, {variables=}")
+                return cached
 
-    def graphql_post(self, query: str, silent=False) -> dict:
         if not silent:
-            self.logger.debug(f"posting to github {query=}")
+            self.logger.debug(f"posting to github {query=}, {variables=}")
 
-        headers = {"Authorization": f"token {self.token}"}
-        resp = self.session.post(
-            url="https://api.github.com/graphql", headers=headers, json={"query": query}
+        payload: dict[str, object] = {"query": with_rate_limit(query)}
+        if variables:
+            payload["variables"] = variables
+        resp, token = await self.__post(
+            payload=payload, cost=cost, priority=priority, silent=silent
         )
 
         if not silent:
             self.logger.debug(f"got from github {resp.content=}")
 
         if not resp.status_code == 200:
+            self.counters["failures"] += 1
             message = f"could not get response from Github {resp.status_code=}."
             self.logger.warning(message)
             raise GithubServerError(detail=message)
+        self.counters["successes"] += 1
         try:
             resp_dict = resp.json()
         except Exception as e:
@@ -51,17 +725,48 @@ class GithubClient:
             message = f"{query=} got response without data : {str(resp_dict)=}"
             self.logger.warning(message)
             raise GithubNoDataResponseError(detail=message)
-        return resp_dict["data"]
-
-    def is_organization(self, login: str, silent=False) -> bool:
-        query = f"""
-            query {{
-                node(id: "{login}") {{
-                    ... on Organization {{
-                        id
-                    }}
-                }}
-            }}
-        """
-        resp = self.graphql_post(query=query, silent=silent)
-        return bool(resp["node"])
+        data = resp_dict["data"]
+        if isinstance(data, dict) and RATE_LIMIT_ALIAS in data:
+            rate_limit = data.pop(RATE_LIMIT_ALIAS)
+            if isinstance(rate_limit, dict):
+                token.rate_limiter.update(rate_limit)
+        if cache_key and cache_ttl and isinstance(data, dict):
+            if not resp_dict.get("errors"):
+                self.cache.set(cache_key, data, cache_ttl)
+        return data
+
+    def uncache(self, query: str, variables: dict[str, object] | None = None):
+        """Drop the cached data of a query, for an answer that must not be kept."""
+        self.cache.discard(GithubResponseCache.key(query, variables))
+
+    def node_loader(
+        self,
+        fragment: str,
+        priority: int = GithubPriority.interactive,
+    ) -> GithubNodeLoader:
+        """The loader shared by every caller selecting `fragment` on nodes."""
+        key = (re.sub(r"\s+", " ", fragment).strip(), priority)
+        if key not in self._node_loaders:
+            self._node_loaders[key] = GithubNodeLoader(
+                client=self, fragment=key[0], priority=priority
+            )
+        return self._node_loaders[key]
+
+
+_github_client: GithubClient | None = None
+
+
+def get_github_client() -> GithubClient:
+    """FastAPI dependency returning the GithubClient shared by the worker."""
+    global _github_client
+    if _github_client is None:
+        _github_client = GithubClient(logger=base_logger)
+    return _github_client
+
+
+async def close_github_client():
+    global _github_client
+    if _github_client is not None:
+        base_logger.info(f"closing github client, {_github_client.metrics()=}")
+        await _github_client.close()
+    _github_client = None
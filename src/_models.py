@@ -9,6 +9,27 @@ class Base(DeclarativeBase):
 class BaseModel(Base):
     __abstract__ = True
 
+    @classmethod
+    def column_names(cls, exclude_field: set[str] = set()) -> list[str]:
+        """
+        Names of the mapped columns of the model, in declaration order.
+
+        Parameters
+        ----------
+        exclude_field : set[str], optional
+            Set of column names to leave out. Default is empty set.
+
+        Returns
+        -------
+        list[str]
+            The column names, usable as select_col of the mysql clients.
+        """
+        return [
+            c.key
+            for c in inspect(cls).mapper.column_attrs
+            if c.key not in exclude_field
+        ]
+
     def to_dict(
         self,
         exclude_null: bool = False,
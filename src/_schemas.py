@@ -1,4 +1,6 @@
 from typing import Generic, TypeVar
+
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -6,7 +8,22 @@ T = TypeVar("T")
 
 class DataResponse(BaseModel, Generic[T]):
     data: T
+    next_cursor: str | None = None
 
 
 class MessageResponse(BaseModel):
     message: str
+
+
+def data_response(
+    data: object, next_cursor: str | None = None, status_code: int = 200
+) -> ORJSONResponse:
+    """A DataResponse body encoded straight with orjson.
+
+    Returning a Response skips FastAPI's validation and serialization of the
+    rows against the response_model, which then only documents the endpoint. Use
+    it for data that comes from the database already in the documented shape.
+    """
+    return ORJSONResponse(
+        content={"data": data, "next_cursor": next_cursor}, status_code=status_code
+    )
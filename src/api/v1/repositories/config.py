@@ -0,0 +1,5 @@
+COMMITS_PAGE_SIZE = 1000
+COMMITS_MAX_PAGE_SIZE = 5000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# ingestion state of a repository, not part of its API representation
+REPOSITORY_PRIVATE_FIELDS = {"backfillHeadId", "backfillCursor", "syncedHeadId"}
@@ -1,13 +1,17 @@
 import traceback
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from _config import base_logger
 from _database_pymysql import (
+    AsyncMysqlClient,
     MySqlNoConnectionError,
     MySqlNoUpdateValuesError,
     MySqlNoValueInsertionError,
     MySqlWrongQueryError,
+    get_async_mysql_client,
+    pooled_async_mysql_client,
 )
 from _exceptions import (
     AlreadyExistsException,
@@ -18,61 +22,154 @@ from _exceptions import (
     NotFoundException,
     WrongAttributesException,
 )
-from _github_api import GithubNoDataResponseError, GithubServerError
-from _schemas import DataResponse, MessageResponse
+from _github_api import (
+    GithubClient,
+    GithubNoDataResponseError,
+    GithubServerError,
+    get_github_client,
+)
+from _schemas import DataResponse, MessageResponse, data_response
+from ingestion import JobKind, enqueue_job, get_job
 from models import Repository
 
-from .schema import RepositoryTrackInput
-from .service import add_repository, get_commits, get_repositories
+from .config import COMMITS_MAX_PAGE_SIZE, COMMITS_PAGE_SIZE, NDJSON_MEDIA_TYPE
+from .schema import CommitOut, IngestionJobOut, RepositoryOut, RepositoryTrackInput
+from .service import get_commit_columns, get_commits, get_repositories, stream_commits
+from .utils import decode_commit_cursor
 
 router = APIRouter(prefix="/repositories")
 
 
-@router.get("", response_model=DataResponse)
-async def fetch_repositories() -> DataResponse:
+@router.get("", response_model=DataResponse[list[RepositoryOut]])
+async def fetch_repositories(
+    fields: str | None = Query(None),
+    mysql_client: AsyncMysqlClient = Depends(get_async_mysql_client),
+) -> ORJSONResponse:
+    """The tracked repositories, with only the comma separated `fields` if set."""
     try:
-        repos = await get_repositories()
+        repos = await get_repositories(mysql_client=mysql_client, fields=fields)
+    except WrongAttributesException as e:
+        raise HTTPWrongAttributesException(detail=str(e))
     except Exception as e:
         base_logger.error(
             f"Error while fetching for repositories, {type(e), str(e), {traceback.format_exc()}}"
         )
         raise HTTPServerException(detail=f"{type(e), str(e), {traceback.format_exc()}}")
-    return DataResponse(data=repos)
+    return data_response(data=repos)
 
 
-@router.post("", status_code=201, response_model=DataResponse)
-async def track_repository(repository_input: RepositoryTrackInput) -> DataResponse:
+@router.post("", status_code=202, response_model=DataResponse[IngestionJobOut])
+async def track_repository(
+    repository_input: RepositoryTrackInput,
+    mysql_client: AsyncMysqlClient = Depends(get_async_mysql_client),
+) -> ORJSONResponse:
+    """Queue the tracking of a repository, follow it with GET /jobs/{job_id}."""
     try:
-        repo = await add_repository(
-            name=repository_input.name,
-            owner_login=repository_input.owner,
-            branch_name=repository_input.branch,
+        job = await enqueue_job(
+            kind=JobKind.track_repository,
+            payload={
+                "name": repository_input.name,
+                "owner_login": repository_input.owner,
+                "branch_name": repository_input.branch,
+            },
+            mysql_client=mysql_client,
+        )
+    except Exception as e:
+        base_logger.error(
+            f"Error while queuing {repository_input=}, {type(e), str(e), {traceback.format_exc()}}"
         )
-    except AlreadyExistsException as e:
-        raise HTTPSqlmodelAlreadyExistsException(
-            entity_name=Repository.__tablename__,
-            entity_bm=repository_input,
-            detail=str(e),
+        raise HTTPServerException(detail=f"{type(e), str(e), {traceback.format_exc()}}")
+
+    return data_response(data=job, status_code=202)
+
+
+@router.post("/sync", status_code=202, response_model=DataResponse[IngestionJobOut])
+async def sync_repository(
+    repo_id: str = Query(...),
+    mysql_client: AsyncMysqlClient = Depends(get_async_mysql_client),
+) -> ORJSONResponse:
+    """Queue the sync of the commits of a tracked repository."""
+    try:
+        if not await mysql_client.id_exists(
+            table_name=Repository.__tablename__, id=repo_id
+        ):
+            raise NotFoundException(table_name=Repository.__tablename__, detail=repo_id)
+        job = await enqueue_job(
+            kind=JobKind.sync_repository,
+            payload={"repositoryId": repo_id},
+            mysql_client=mysql_client,
+            repository_id=repo_id,
         )
-    except (MySqlNoValueInsertionError, WrongAttributesException) as e:
-        raise HTTPWrongAttributesException(detail=f"{str(e)}")
+    except NotFoundException as e:
+        raise HTTPSNotFoundException(detail=str(e))
     except Exception as e:
         base_logger.error(
-            f"Error while adding {repository_input=}, {type(e), str(e), {traceback.format_exc()}}"
+            f"Error while queuing sync of {repo_id=}, {type(e), str(e), {traceback.format_exc()}}"
         )
         raise HTTPServerException(detail=f"{type(e), str(e), {traceback.format_exc()}}")
 
-    return DataResponse(data=repo)
+    return data_response(data=job, status_code=202)
 
 
-@router.get("/commits", response_model=DataResponse)
-async def fetch_commits(repo_id: str = Query(...)) -> DataResponse:
+@router.get("/jobs/{job_id}", response_model=DataResponse[IngestionJobOut])
+async def fetch_job(
+    job_id: str,
+    mysql_client: AsyncMysqlClient = Depends(get_async_mysql_client),
+) -> ORJSONResponse:
+    try:
+        job = await get_job(job_id=job_id, mysql_client=mysql_client)
+    except NotFoundException as e:
+        raise HTTPSNotFoundException(detail=str(e))
+    except Exception as e:
+        base_logger.error(
+            f"Error while fetching job {job_id=}, {type(e), str(e), {traceback.format_exc()}}"
+        )
+        raise HTTPServerException(detail=f"{type(e), str(e), {traceback.format_exc()}}")
+    return data_response(data=job)
+
+
+@router.get("/commits", response_model=DataResponse[list[CommitOut]])
+async def fetch_commits(
+    repo_id: str = Query(...),
+    limit: int = Query(COMMITS_PAGE_SIZE, ge=1, le=COMMITS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    stream: bool = Query(False),
+    fields: str | None = Query(None),
+    accept: str | None = Header(None),
+) -> ORJSONResponse | StreamingResponse:
+    """A page of commits, or with `stream=true` or an `Accept:
+    application/x-ndjson` header, every commit from `cursor` on as NDJSON.
+
+    `fields` is a comma separated list of commit columns to return, committedDate
+    and id are always returned.
+
+    The route takes no connection as a dependency: the stream checks out its own,
+    held until it ends, so only the page path borrows one here."""
     if not repo_id:
         raise HTTPWrongAttributesException(
             detail="repo_id query parameter is required to be not null"
         )
+    if stream or (accept and NDJSON_MEDIA_TYPE in accept):
+        try:
+            seek_after = list(decode_commit_cursor(cursor)) if cursor else list()
+            select_col = get_commit_columns(fields)
+        except WrongAttributesException as e:
+            raise HTTPWrongAttributesException(detail=str(e))
+        return StreamingResponse(
+            stream_commits(
+                repo_id=repo_id, seek_after=seek_after, select_col=select_col
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
     try:
-        commits = await get_commits(repo_id=repo_id)
+        async with pooled_async_mysql_client() as mysql_client:
+            commits, next_cursor = await get_commits(
+                repo_id=repo_id,
+                mysql_client=mysql_client,
+                limit=limit,
+                cursor=cursor,
+                fields=fields,
+            )
     except WrongAttributesException as e:
         raise HTTPWrongAttributesException(detail=str(e))
     except Exception as e:
@@ -80,4 +177,4 @@ async def fetch_commits(repo_id: str = Query(...)) -> DataResponse:
             f"Error while fetching commits of {repo_id=}, {type(e), str(e), {traceback.format_exc()}}"
         )
         raise HTTPServerException(detail=f"{type(e), str(e), {traceback.format_exc()}}")
-    return DataResponse(data=commits)
+    return data_response(data=commits, next_cursor=next_cursor)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -5,3 +7,65 @@ class RepositoryTrackInput(BaseModel):
     owner: str
     name: str
     branch: str
+
+
+class RepositoryOut(BaseModel):
+    """A repository, with only the fields asked for when `fields` is set.
+
+    Without `fields`, id, name, ownerIdUser, ownerIdOrganization,
+    ownerIsOrganization and ownerLogin are returned.
+    """
+
+    id: str | None = None
+    oldId: str | None = None
+    name: str | None = None
+    createdAt: datetime | None = None
+    # TINYINT(1), 0 or 1
+    rootCommitIsReached: int | None = None
+    isPrivate: int | None = None
+    trackedBranchName: str | None = None
+    trackedBranchRef: str | None = None
+    ownerIsOrganization: int | None = None
+    ownerIdUser: str | None = None
+    ownerIdOrganization: str | None = None
+    ownerLogin: str | None = None
+
+
+class CommitOut(BaseModel):
+    """A commit, with only the fields asked for when `fields` is set.
+
+    id and committedDate, which the cursor is made of, are always returned.
+    Without `fields`, additions, deletions, authorAvatarUrl and authorName are
+    returned as well.
+    """
+
+    id: str
+    committedDate: datetime
+    oldId: str | None = None
+    repositoryId: str | None = None
+    additions: int | None = None
+    deletions: int | None = None
+    authoredDate: datetime | None = None
+    authorAvatarUrl: str | None = None
+    authorEmail: str | None = None
+    authorId: str | None = None
+    authorName: str | None = None
+    committerAvatarUrl: str | None = None
+    committerEmail: str | None = None
+    committerId: str | None = None
+    committerName: str | None = None
+
+
+class IngestionJobOut(BaseModel):
+    id: str
+    kind: str
+    status: str
+    repositoryId: str | None
+    payload: dict | None
+    progress: dict | None
+    error: str | None
+    attempts: int
+    createdAt: datetime
+    updatedAt: datetime
+    startedAt: datetime | None
+    finishedAt: datetime | None
@@ -1,15 +1,17 @@
 import traceback
-from datetime import datetime
+from typing import AsyncIterator
 
-from pymysql.err import IntegrityError
+import orjson
 
-from _config import DateTimeFormat, base_logger
+from _config import base_logger
 from _database_pymysql import (
-    MysqlClient,
+    AsyncMysqlClient,
+    MySqlJoin,
     MySqlNoConnectionError,
     MySqlNoUpdateValuesError,
     MySqlNoValueInsertionError,
     MySqlWrongQueryError,
+    pooled_async_mysql_client,
 )
 from _exceptions import (
     AlreadyExistsException,
@@ -19,199 +21,146 @@ from _exceptions import (
 from _github_api import GithubClient, GithubNoDataResponseError, GithubServerError
 from models import Commit, GitOrganization, GitUser, Repository
 
-
-async def add_repository(
-    name: str, owner_login: str, branch_name: str
-) -> dict[str, object]:
-    base_logger.info(f"adding repository with {name=}, {owner_login=}, {branch_name=}")
-    mysql_client = MysqlClient(logger=base_logger)
-    github_client = GithubClient(logger=base_logger)
-
-    ## 1. Call Github to get the info about the repo (nodeId)
-    # 1.1 Get repo info
-    query = f"""
-    query {{
-        repository(owner: "{owner_login}", name: "{name}") {{ 
-            id
-            isPrivate
-            createdAt
-            owner {{
-                id
-            }}
-        }}
-    }}
-    """
-    repo_info = github_client.graphql_post(query=query)["repository"]
-    if not repo_info:
-        message = f"could not retreive any repository info for {name=}, {owner_login=}"
-        base_logger.warning(message)
-        raise WrongAttributesException(message)
-    is_organization = github_client.is_organization(login=str(repo_info["owner"]["id"]))
-
-    repo = Repository(
-        id=repo_info["id"],
-        name=name,
-        ownerIsOrganization=is_organization,
-        ownerIdOrganization=(repo_info["owner"]["id"] if is_organization else None),
-        ownerIdUser=(repo_info["owner"]["id"] if not is_organization else None),
-        isPrivate=repo_info["isPrivate"] == "True",
-        createdAt=datetime.strptime(repo_info["createdAt"], DateTimeFormat.github),
-    )
-    base_logger.debug(f"created object {repo.to_dict()=}")
-
-    # 1.2 Check if branch is valid
-    base_logger.debug(f"checking if {branch_name=} is a valid branch")
-    query = f"""
-    query {{
-        repository(owner: "{owner_login}", name: "{name}") {{
-            ref(qualifiedName: "refs/heads/{branch_name}") {{
-                target {{
-                    ... on Commit {{
-                        id
-                    }}
-                }}
-            }}
-        }}
-    }}
-    """
-    resp = github_client.graphql_post(query=query)
-    if not resp["repository"]["ref"]:
-        message = (
-            f"could not retreive any info with {name=}, {owner_login=}, {branch_name=}"
-        )
-        base_logger.warning(message)
-        raise WrongAttributesException(message)
-
-    repo.trackedBranchName = branch_name
-    repo.trackedBranchRef = "refs/heads/" + branch_name
-    repo.rootCommitIsReached = False
-
-    ## 2. Add user in DB
-    # 2.1 Get user info
-    base_logger.debug(f"trying to get github owner info from github")
-    owner_id = (
-        repo.ownerIdOrganization if repo.ownerIsOrganization else repo.ownerIdUser
+from .config import COMMITS_PAGE_SIZE, REPOSITORY_PRIVATE_FIELDS
+from .utils import decode_commit_cursor, encode_commit_cursor, parse_fields
+
+COMMIT_COLUMNS = [
+    "id",
+    "additions",
+    "deletions",
+    "committedDate",
+    "authorAvatarUrl",
+    "authorName",
+]
+COMMIT_FIELDS = Commit.column_names()
+# the keyset of the commits pagination, selected whatever the fields
+COMMIT_SEEK_COLUMNS = ["committedDate", "id"]
+
+# resolved from the joined owner tables, not a repository column
+REPOSITORY_OWNER_LOGIN = (
+    "IF(repository.ownerIsOrganization, git_organization.login, git_user.login)"
+)
+REPOSITORY_COLUMNS = [
+    "id",
+    "name",
+    "ownerIdUser",
+    "ownerIdOrganization",
+    "ownerIsOrganization",
+    "ownerLogin",
+]
+REPOSITORY_FIELDS = Repository.column_names(exclude_field=REPOSITORY_PRIVATE_FIELDS) + [
+    "ownerLogin"
+]
+
+
+def get_commit_columns(fields: str | None = None) -> list[str]:
+    """The commit columns to select for a `fields` query parameter."""
+    return parse_fields(
+        fields=fields,
+        allowed=COMMIT_FIELDS,
+        default=COMMIT_COLUMNS,
+        required=COMMIT_SEEK_COLUMNS,
     )
-    query = f"""
-    query {{
-        node(id: "{owner_id}") {{
-            ... on {"Organization" if repo.ownerIsOrganization else "User"} {{
-                avatarUrl
-                email
-                id
-                login
-                name
-            }}
-        }}
-    }}
-    """
-    owner_info = github_client.graphql_post(query=query)["node"]
-    if not owner_info:
-        message = f"could not retreive any user info for {owner_id=}"
-        base_logger.warning(message)
-        raise WrongAttributesException(message)
-
-    if repo.ownerIsOrganization:
-        github_owner = GitOrganization(
-            id=owner_info["id"],
-            avatarUrl=owner_info["avatarUrl"],
-            email=owner_info["email"],
-            name=owner_info["name"],
-            login=owner_info["login"],
-        )
-    else:
-        github_owner = GitUser(
-            id=owner_info["id"],
-            avatarUrl=owner_info["avatarUrl"],
-            email=owner_info["email"],
-            name=owner_info["name"],
-            login=owner_info["login"],
-        )
-    base_logger.debug(f"got {github_owner.to_dict()=}")
-
-    # 2.2 Add user if not present
-    base_logger.debug(f"adding github user in database")
-    if repo.ownerIsOrganization:
-        mysql_client.insert_one(
-            table_name=GitOrganization.__tablename__,
-            values=github_owner.to_dict(),
-            or_ignore=True,
-        )
-    else:
-        mysql_client.insert_one(
-            table_name=GitUser.__tablename__,
-            values=github_owner.to_dict(),
-            or_ignore=True,
-        )
-    base_logger.debug(f"successfuly added {github_owner.to_dict()=}")
 
-    # 3. Add repo in DB
-    base_logger.debug(f"trying to add repo in db, {repo.to_dict()=}")
-    try:
-        mysql_client.insert_one(
-            table_name=Repository.__tablename__, values=repo.to_dict()
-        )
-    except IntegrityError as e:
-        raise AlreadyExistsException(table_name=Repository.__tablename__, detail=str(e))
-    base_logger.debug(f"successfully added to db {repo.to_dict()=}")
 
-    # 4. Return created one
-    return repo.to_dict()
+async def get_commits(
+    repo_id: str,
+    mysql_client: AsyncMysqlClient,
+    limit: int = COMMITS_PAGE_SIZE,
+    cursor: str | None = None,
+    fields: str | None = None,
+) -> tuple[list[dict[str, object]], str | None]:
+    """Fetch one page of commits, ordered by (committedDate, id).
 
+    Only the columns in `fields` are selected, plus committedDate and id, which
+    the cursor is made of. Returns the page and the cursor of the next one, None
+    on the last page.
+    """
+    base_logger.info(f"fetching commits of {repo_id=}, {limit=}, {cursor=}, {fields=}")
+    select_col = get_commit_columns(fields)
+    seek_after = list(decode_commit_cursor(cursor)) if cursor else list()
 
-async def get_commits(repo_id: str) -> list[dict[str, object]]:
-    base_logger.info(f"fetching commits of {repo_id=}")
-    mysql_client = MysqlClient(logger=base_logger)
-
-    commits = mysql_client.select(
+    commits = await mysql_client.select(
         table_name=Commit.__tablename__,
-        select_col=[
-            "id",
-            "additions",
-            "deletions",
-            "committedDate",
-            "authorAvatarUrl",
-            "authorName",
-        ],
+        select_col=select_col,
         cond_eq={"repositoryId": repo_id},
+        seek_col=COMMIT_SEEK_COLUMNS,
+        seek_after=seek_after,
+        limit=limit + 1,
     )
-    base_logger.debug(f"got commits for {repo_id=} from db, {commits=}")
-
-    return [c for c in commits]
-
-
-async def get_repositories() -> list[dict[str, object]]:
-    base_logger.info(f"fetching repositories from db")
-    mysql_client = MysqlClient(logger=base_logger)
-
-    repos = mysql_client.select(
-        table_name=Repository.__tablename__,
-        select_col=[
-            "id",
-            "name",
-            "ownerIdUser",
-            "ownerIdOrganization",
-            "ownerIsOrganization",
-        ],
+    base_logger.debug(f"got {len(commits)} commits for {repo_id=} from db")
+
+    next_cursor = None
+    if len(commits) > limit:
+        commits = commits[:limit]
+        last = commits[-1]
+        next_cursor = encode_commit_cursor(
+            committed_date=last["committedDate"],  # type: ignore
+            commit_id=str(last["id"]),
+        )
+    return list(commits), next_cursor
+
+
+async def stream_commits(
+    repo_id: str,
+    seek_after: list[object] | None = None,
+    select_col: list[str] | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield the commits of a repository as NDJSON, batch by batch.
+
+    Rows come from a server-side cursor, so memory and time to first byte do
+    not grow with the repository. The generator runs after the request
+    dependencies have exited, so it checks out its own pooled connection, held
+    until the stream ends, the route must not take one as well. If the client
+    goes away, the connection is dropped instead of reading the rows left.
+    `select_col` comes from get_commit_columns, called before the stream starts
+    so that invalid fields still fail the request.
+    """
+    base_logger.info(f"streaming commits of {repo_id=}, {seek_after=}")
+    async with pooled_async_mysql_client() as mysql_client:
+        async for batch in mysql_client.select_iter(
+            table_name=Commit.__tablename__,
+            select_col=select_col if select_col else COMMIT_COLUMNS,
+            cond_eq={"repositoryId": repo_id},
+            seek_col=COMMIT_SEEK_COLUMNS,
+            seek_after=seek_after if seek_after else list(),
+        ):
+            yield b"".join(orjson.dumps(row) + b"\n" for row in batch)
+
+
+async def get_repositories(
+    mysql_client: AsyncMysqlClient, fields: str | None = None
+) -> list[dict[str, object]]:
+    base_logger.info(f"fetching repositories from db, {fields=}")
+    columns = parse_fields(
+        fields=fields, allowed=REPOSITORY_FIELDS, default=REPOSITORY_COLUMNS
     )
-    base_logger.debug(f"got repositories from db, {repos=}")
 
-    for repo in repos:
-        base_logger.debug(f"fetching user from db for {repo=}")
-        if repo["ownerIsOrganization"]:
-            owner = mysql_client.select_by_id(
+    # owners are resolved by MySQL in the same query, when asked for
+    joins = list()
+    if "ownerLogin" in columns:
+        joins = [
+            MySqlJoin(
                 table_name=GitOrganization.__tablename__,
-                id=str(repo["ownerIdOrganization"]),
-                select_col=["login"],
-            )
-        else:
-            owner = mysql_client.select_by_id(
+                on=(("repository.ownerIdOrganization", "git_organization.id"),),
+            ),
+            MySqlJoin(
                 table_name=GitUser.__tablename__,
-                id=str(repo["ownerIdUser"]),
-                select_col=["login"],
+                on=(("repository.ownerIdUser", "git_user.id"),),
+            ),
+        ]
+    repos = await mysql_client.select_join(
+        table_name=Repository.__tablename__,
+        joins=joins,
+        select_col=[
+            (
+                f"{REPOSITORY_OWNER_LOGIN} AS ownerLogin"
+                if col == "ownerLogin"
+                else f"repository.{col}"
             )
-        repo["ownerLogin"] = owner["login"]
-        base_logger.debug(f"got user from db for {repo=}")
+            for col in columns
+        ],
+    )
 
     base_logger.debug(f"final info for repositories from db, {repos=}")
     return [r for r in repos]
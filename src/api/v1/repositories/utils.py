@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+
+from _config import DateTimeFormat
+from _exceptions import WrongAttributesException
+
+
+def encode_commit_cursor(committed_date: datetime, commit_id: str) -> str:
+    payload = json.dumps(
+        [committed_date.strftime(DateTimeFormat.bp_co_long), commit_id]
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_commit_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        committed_date, commit_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return (
+            datetime.strptime(committed_date, DateTimeFormat.bp_co_long),
+            str(commit_id),
+        )
+    except Exception:
+        raise WrongAttributesException(f"invalid commits cursor, {cursor=}")
+
+
+def parse_fields(
+    fields: str | None,
+    allowed: list[str],
+    default: list[str],
+    required: list[str] = list(),
+) -> list[str]:
+    """The columns asked for by a comma separated `fields` query parameter.
+
+    Unknown fields are rejected rather than ignored, the `default` ones are used
+    when `fields` is empty, and the `required` ones missing are selected first.
+    """
+    names = [f.strip() for f in fields.split(",") if f.strip()] if fields else list()
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise WrongAttributesException(
+            f"unknown fields {unknown}, allowed fields are {allowed}"
+        )
+    selected = list(dict.fromkeys(names or default))
+    return [col for col in required if col not in selected] + selected
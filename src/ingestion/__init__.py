@@ -0,0 +1,3 @@
+from .config import JobKind, JobStatus
+from .jobs import enqueue_job, get_job, start_ingestion_workers, stop_ingestion_workers
+from .service import add_repository, backfill_repository, sync_repository
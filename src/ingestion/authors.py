@@ -0,0 +1,104 @@
+from _config import base_logger
+from _database_pymysql import AsyncMysqlClient
+from models import Commit, GitUser
+
+from .config import AUTHOR_CACHE_MAX_SIZE
+
+
+class AuthorIdentityCache:
+    """In-process record of the git_user rows already in the database.
+
+    Users are known by Github user id, and git emails are mapped to the user id
+    they were last seen with, so commits whose author Github did not link to a
+    user still get their authorId when the email is known. The cache is warmed
+    once per repository from its commits, so resolving authors costs one lookup
+    per distinct author instead of one per commit.
+    """
+
+    def __init__(self, max_size: int = AUTHOR_CACHE_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self.user_ids: set[str] = set()
+        self.ids_by_email: dict[str, str] = dict()
+        self.warmed_repositories: set[str] = set()
+        self.counters = {"resolved_by_email": 0, "written": 0, "skipped": 0}
+
+    def __check_size(self):
+        # rows are written with INSERT IGNORE, forgetting them is always safe
+        if len(self.user_ids) + len(self.ids_by_email) > self.max_size:
+            self.user_ids.clear()
+            self.ids_by_email.clear()
+            self.warmed_repositories.clear()
+
+    def learn(self, user_id: str, email: str | None = None):
+        self.user_ids.add(user_id)
+        if email:
+            self.ids_by_email[email.lower()] = user_id
+
+    async def warm(self, repo_id: str, mysql_client: AsyncMysqlClient):
+        """Load the authors and committers of the commits of a repository."""
+        if repo_id in self.warmed_repositories:
+            return
+        self.__check_size()
+        for id_col, email_col in (
+            ("authorId", "authorEmail"),
+            ("committerId", "committerEmail"),
+        ):
+            rows = await mysql_client.select_join(
+                table_name=Commit.__tablename__,
+                select_col=[id_col, email_col],
+                cond_eq={"repositoryId": repo_id},
+                cond_not_null=[id_col],
+                group_by=[id_col, email_col],
+                silent=True,
+            )
+            for row in rows:
+                self.learn(user_id=str(row[id_col]), email=row[email_col])  # type: ignore
+        self.warmed_repositories.add(repo_id)
+        base_logger.debug(f"warmed author cache for {repo_id=}, {self.metrics()=}")
+
+    def resolve(self, commit: Commit):
+        """Fill the author and committer ids of a commit, learning from it."""
+        for id_attr, email_attr in (
+            ("authorId", "authorEmail"),
+            ("committerId", "committerEmail"),
+        ):
+            user_id = getattr(commit, id_attr)
+            email = getattr(commit, email_attr)
+            if user_id:
+                if email:
+                    self.ids_by_email[email.lower()] = user_id
+            elif email and email.lower() in self.ids_by_email:
+                setattr(commit, id_attr, self.ids_by_email[email.lower()])
+                self.counters["resolved_by_email"] += 1
+
+    def unknown(self, users: dict[str, GitUser]) -> list[GitUser]:
+        """The users not yet known to be in the database."""
+        unknown = [
+            user for user_id, user in users.items() if user_id not in self.user_ids
+        ]
+        self.counters["skipped"] += len(users) - len(unknown)
+        return unknown
+
+    def mark_written(self, users: list[GitUser]):
+        self.__check_size()
+        self.user_ids.update(user.id for user in users)
+        self.counters["written"] += len(users)
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            **self.counters,
+            "users": len(self.user_ids),
+            "emails": len(self.ids_by_email),
+            "repositories": len(self.warmed_repositories),
+        }
+
+
+_author_identity_cache: AuthorIdentityCache | None = None
+
+
+def get_author_identity_cache() -> AuthorIdentityCache:
+    """The AuthorIdentityCache shared by the ingestion jobs of the process."""
+    global _author_identity_cache
+    if _author_identity_cache is None:
+        _author_identity_cache = AuthorIdentityCache()
+    return _author_identity_cache
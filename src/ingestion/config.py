@@ -0,0 +1,20 @@
+# most commits Github returns in a single history page
+HISTORY_PAGE_SIZE = 100
+# commits buffered before being written, with the checkpoint, in one transaction
+COMMITS_WRITE_BATCH_SIZE = 1000
+# history pages, and transformed pages, buffered between pipeline stages
+PIPELINE_QUEUE_SIZE = 4
+# users and emails remembered by the author identity cache before it is reset
+AUTHOR_CACHE_MAX_SIZE = 200_000
+
+
+class JobStatus:
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class JobKind:
+    track_repository = "track_repository"
+    sync_repository = "sync_repository"
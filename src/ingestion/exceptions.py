@@ -0,0 +1,3 @@
+class TrackedBranchNotFoundError(Exception):
+    def __init__(self, repo_id: str, branch_ref: str):
+        super().__init__(f"no commit found for {branch_ref=} of {repo_id=}")
@@ -0,0 +1,448 @@
+import asyncio
+import json
+import traceback
+import uuid
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from _config import (
+    INGESTION_JOB_HEARTBEAT_INTERVAL,
+    INGESTION_JOB_STALE_AFTER,
+    INGESTION_MAX_ATTEMPTS,
+    INGESTION_POLL_INTERVAL,
+    INGESTION_WORKERS,
+    base_logger,
+)
+from _database_pymysql import AsyncMysqlClient, get_mysql_pool
+from _exceptions import (
+    AlreadyExistsException,
+    NotFoundException,
+    WrongAttributesException,
+)
+from _github_api import GithubClient, get_github_client
+from models import IngestionJob
+
+from .config import JobKind, JobStatus
+from .exceptions import TrackedBranchNotFoundError
+from .service import add_repository, sync_repository
+from .utils import utc_now
+
+# retrying a job failing with one of those would fail the same way
+NON_RETRYABLE_ERRORS = (
+    AlreadyExistsException,
+    NotFoundException,
+    WrongAttributesException,
+    TrackedBranchNotFoundError,
+)
+
+JobHandler = Callable[..., Awaitable[dict[str, object]]]
+JOB_HANDLERS: dict[str, JobHandler] = dict()
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the coroutine running the jobs of `kind`.
+
+    It is called with the job payload as keyword arguments plus mysql_client,
+    github_client and on_progress, and returns the job result.
+    """
+
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+def job_to_dict(job: dict[str, object]) -> dict[str, object]:
+    """A job row with its json columns decoded."""
+    return {
+        **job,
+        **{
+            col: json.loads(str(job[col])) if job.get(col) else None
+            for col in ("payload", "progress")
+        },
+    }
+
+
+async def enqueue_job(
+    kind: str,
+    payload: dict[str, object],
+    mysql_client: AsyncMysqlClient,
+    repository_id: str | None = None,
+) -> dict[str, object]:
+    now = utc_now()
+    job = IngestionJob(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        status=JobStatus.queued,
+        repositoryId=repository_id,
+        payload=json.dumps(payload),
+        attempts=0,
+        createdAt=now,
+        updatedAt=now,
+    )
+    await mysql_client.insert_one(
+        table_name=IngestionJob.__tablename__, values=job.to_dict()
+    )
+    base_logger.info(f"enqueued ingestion job {job.id=}, {kind=}, {payload=}")
+    notify_ingestion_workers()
+    return job_to_dict(job.to_dict())
+
+
+async def get_job(job_id: str, mysql_client: AsyncMysqlClient) -> dict[str, object]:
+    job = await mysql_client.select_by_id(
+        table_name=IngestionJob.__tablename__, id=job_id
+    )
+    if not job:
+        raise NotFoundException(table_name=IngestionJob.__tablename__, detail=job_id)
+    return job_to_dict(job)
+
+
+async def claim_job(mysql_client: AsyncMysqlClient) -> dict[str, object] | None:
+    """Take the oldest queued job, or a running one whose worker died.
+
+    Rows locked by other workers are skipped, so concurrent workers, in this
+    process or another, never claim the same job. A job whose worker died on
+    each of its INGESTION_MAX_ATTEMPTS claims is marked failed instead of being
+    claimed again, it would most likely kill the next one as well.
+    """
+    now = utc_now()
+    stale_before = now - timedelta(seconds=INGESTION_JOB_STALE_AFTER)
+    async with mysql_client.transaction():
+        jobs = await mysql_client.select(
+            table_name=IngestionJob.__tablename__,
+            cond_eq={"status": JobStatus.queued},
+            order_by="createdAt",
+            limit=1,
+            for_update=True,
+            skip_locked=True,
+            silent=True,
+        )
+        if not jobs:
+            await mysql_client.update(
+                table_name=IngestionJob.__tablename__,
+                update_col_value={
+                    "status": JobStatus.failed,
+                    "error": "WorkerLost: the worker died on every attempt",
+                    "finishedAt": now,
+                    "updatedAt": now,
+                },
+                cond_eq={"status": JobStatus.running},
+                cond_l={"updatedAt": stale_before},
+                cond_geq={"attempts": INGESTION_MAX_ATTEMPTS},
+                silent=True,
+            )
+            jobs = await mysql_client.select(
+                table_name=IngestionJob.__tablename__,
+                cond_eq={"status": JobStatus.running},
+                cond_l={
+                    "updatedAt": stale_before,
+                    "attempts": INGESTION_MAX_ATTEMPTS,
+                },
+                order_by="updatedAt",
+                limit=1,
+                for_update=True,
+                skip_locked=True,
+                silent=True,
+            )
+        if not jobs:
+            return None
+        job = dict(jobs[0])
+        job.update(
+            {
+                "status": JobStatus.running,
+                "attempts": int(job["attempts"]) + 1,  # type: ignore
+                "startedAt": now,
+                "updatedAt": now,
+            }
+        )
+        await mysql_client.update(
+            table_name=IngestionJob.__tablename__,
+            update_col_value={
+                col: job[col]
+                for col in ("status", "attempts", "startedAt", "updatedAt")
+            },
+            cond_eq={"id": job["id"]},
+        )
+    return job
+
+
+async def set_claimed_job(
+    job: dict[str, object], values: dict[str, object], mysql_client: AsyncMysqlClient
+):
+    """Update a job, unless it was claimed again since `job` was.
+
+    Each claim increments attempts, so matching on it keeps a worker that lost
+    its job from overwriting the state written by the one that took it over.
+    """
+    await mysql_client.update(
+        table_name=IngestionJob.__tablename__,
+        update_col_value={**values, "updatedAt": utc_now()},
+        cond_eq={"id": job["id"], "attempts": job["attempts"]},
+        silent=True,
+    )
+
+
+async def is_job_claimed(
+    job: dict[str, object], mysql_client: AsyncMysqlClient
+) -> bool:
+    """Whether `job` is still running under the claim it was taken with."""
+    return bool(
+        await mysql_client.count(
+            table_name=IngestionJob.__tablename__,
+            cond_eq={
+                "id": job["id"],
+                "attempts": job["attempts"],
+                "status": JobStatus.running,
+            },
+            silent=True,
+        )
+    )
+
+
+async def heartbeat_job(job: dict[str, object], handler_task: asyncio.Task) -> bool:
+    """Keep a running job from looking stale, cancel it once it is lost.
+
+    Progress is only saved between batches, a long rate limit wait would
+    otherwise let another worker claim the job while it still runs. Beats use
+    their own connection, the handler's one is busy with its queries. Returns
+    True if the job was lost.
+    """
+    while not handler_task.done():
+        await asyncio.sleep(INGESTION_JOB_HEARTBEAT_INTERVAL)
+        try:
+            mysql_client = await AsyncMysqlClient.connect(
+                logger=base_logger, pool=get_mysql_pool()
+            )
+            try:
+                await set_claimed_job(job=job, values={}, mysql_client=mysql_client)
+                claimed = await is_job_claimed(job=job, mysql_client=mysql_client)
+            finally:
+                await mysql_client.close()
+        except Exception:
+            base_logger.warning(
+                f"heartbeat of ingestion job {job['id']=} failed, "
+                f"{traceback.format_exc()}"
+            )
+            continue
+        if not claimed:
+            base_logger.warning(
+                f"ingestion job {job['id']=} was claimed by another worker, "
+                "cancelling it"
+            )
+            handler_task.cancel()
+            return True
+    return False
+
+
+async def run_job(
+    job: dict[str, object],
+    mysql_client: AsyncMysqlClient,
+    github_client: GithubClient,
+):
+    job_id = str(job["id"])
+    base_logger.info(f"running ingestion job {job_id=}, {job['kind']=}")
+
+    async def set_job(values: dict[str, object]):
+        await set_claimed_job(job=job, values=values, mysql_client=mysql_client)
+
+    async def on_progress(progress: dict[str, object]):
+        await set_job({"progress": json.dumps(progress, default=str)})
+
+    handler = JOB_HANDLERS.get(str(job["kind"]))
+    heartbeat = None
+    try:
+        if handler is None:
+            raise WrongAttributesException(f"no handler for {job['kind']=}")
+        handler_task = asyncio.ensure_future(
+            handler(
+                **json.loads(str(job["payload"] or "{}")),
+                mysql_client=mysql_client,
+                github_client=github_client,
+                on_progress=on_progress,
+            )
+        )
+        heartbeat = asyncio.ensure_future(heartbeat_job(job, handler_task))
+        try:
+            result = await handler_task
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                # lost to another worker, which now owns its state
+                return
+            raise
+    except Exception as e:
+        retry = (
+            not isinstance(e, NON_RETRYABLE_ERRORS)
+            and int(job["attempts"]) < INGESTION_MAX_ATTEMPTS  # type: ignore
+        )
+        base_logger.warning(
+            f"ingestion job {job_id=} failed, {retry=}, {traceback.format_exc()}"
+        )
+        await set_job(
+            {
+                "status": JobStatus.queued if retry else JobStatus.failed,
+                "error": f"{type(e).__name__}: {str(e)}",
+                "finishedAt": None if retry else utc_now(),
+            }
+        )
+        return
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+
+    values = {
+        "status": JobStatus.done,
+        "progress": json.dumps(result, default=str),
+        "error": None,
+        "finishedAt": utc_now(),
+    }
+    if result.get("repositoryId"):
+        values["repositoryId"] = result["repositoryId"]
+    await set_job(values)
+    base_logger.info(f"ingestion job {job_id=} done, {result=}")
+
+
+@job_handler(JobKind.track_repository)
+async def run_track_repository(
+    name: str,
+    owner_login: str,
+    branch_name: str,
+    mysql_client: AsyncMysqlClient,
+    github_client: GithubClient,
+    on_progress: Callable[[dict[str, object]], Awaitable[None]] | None = None,
+) -> dict[str, object]:
+    """Add the repository, then queue the sync of its commits as its own job.
+
+    Both are written in one transaction, a retry never finds the repository
+    added without its sync job. The history backfill is retried on its own,
+    without adding the repository again.
+    """
+    async with mysql_client.transaction():
+        repo = await add_repository(
+            name=name,
+            owner_login=owner_login,
+            branch_name=branch_name,
+            mysql_client=mysql_client,
+            github_client=github_client,
+        )
+        sync_job = await enqueue_job(
+            kind=JobKind.sync_repository,
+            payload={"repositoryId": repo["id"]},
+            mysql_client=mysql_client,
+            repository_id=str(repo["id"]),
+        )
+    return {"repositoryId": repo["id"], "syncJobId": sync_job["id"]}
+
+
+@job_handler(JobKind.sync_repository)
+async def run_sync_repository(
+    repositoryId: str,
+    mysql_client: AsyncMysqlClient,
+    github_client: GithubClient,
+    on_progress: Callable[[dict[str, object]], Awaitable[None]] | None = None,
+) -> dict[str, object]:
+    return await sync_repository(
+        repo_id=repositoryId,
+        mysql_client=mysql_client,
+        github_client=github_client,
+        on_progress=on_progress,
+    )
+
+
+class IngestionWorkerPool:
+    """Async workers running the ingestion jobs of the MySQL job table.
+
+    Each worker claims one job at a time with SELECT ... FOR UPDATE SKIP LOCKED,
+    so any number of pools, one per server worker process, share the table
+    without a broker. Idle workers poll every `poll_interval` seconds, or sooner
+    when a job is enqueued by this process.
+    """
+
+    def __init__(
+        self,
+        workers: int = INGESTION_WORKERS,
+        poll_interval: float = INGESTION_POLL_INTERVAL,
+    ) -> None:
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: list[asyncio.Task] = list()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.counters = {"done": 0, "errors": 0}
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self.__work(i), name=f"ingestion_worker_{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = list()
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def __run_next(self) -> bool:
+        mysql_client = await AsyncMysqlClient.connect(
+            logger=base_logger, pool=get_mysql_pool()
+        )
+        try:
+            job = await claim_job(mysql_client=mysql_client)
+            if not job:
+                return False
+            await run_job(
+                job=job, mysql_client=mysql_client, github_client=get_github_client()
+            )
+            self.counters["done"] += 1
+            return True
+        finally:
+            await mysql_client.close()
+
+    async def __work(self, worker: int):
+        base_logger.info(f"ingestion worker {worker} started")
+        while not self._stopping:
+            try:
+                ran = await self.__run_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.counters["errors"] += 1
+                base_logger.error(
+                    f"ingestion worker {worker} error, {traceback.format_exc()}"
+                )
+                ran = False
+            if ran:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+_worker_pool: IngestionWorkerPool | None = None
+
+
+def start_ingestion_workers():
+    global _worker_pool
+    if _worker_pool is None and INGESTION_WORKERS > 0:
+        _worker_pool = IngestionWorkerPool()
+        _worker_pool.start()
+
+
+async def stop_ingestion_workers():
+    global _worker_pool
+    if _worker_pool is not None:
+        base_logger.info(f"stopping ingestion workers, {_worker_pool.counters=}")
+        await _worker_pool.stop()
+    _worker_pool = None
+
+
+def notify_ingestion_workers():
+    if _worker_pool is not None:
+        _worker_pool.notify()
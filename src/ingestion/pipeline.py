@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from models import Commit, GitUser
+
+from .config import COMMITS_WRITE_BATCH_SIZE, PIPELINE_QUEUE_SIZE
+
+# end of stream marker passed down the queues
+DONE = None
+
+
+class StageStats:
+    """Items handled by a stage and the time it spent working on them.
+
+    Time spent waiting on its queues is counted apart, a stage mostly waiting
+    for its input is not the bottleneck, one mostly waiting to put its output is
+    held back by the next stage.
+    """
+
+    def __init__(self) -> None:
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.waiting_input_seconds = 0.0
+        self.waiting_output_seconds = 0.0
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "items": self.items,
+            "busySeconds": self.busy_seconds,
+            "waitingInputSeconds": self.waiting_input_seconds,
+            "waitingOutputSeconds": self.waiting_output_seconds,
+            "itemsPerSecond": (
+                self.items / self.busy_seconds if self.busy_seconds else 0.0
+            ),
+        }
+
+
+class CommitPipeline:
+    """Fetch, transform and write commit history pages concurrently.
+
+    The fetcher reads history pages from `cursor` on and runs ahead of the
+    writer by at most `queue_size` pages, the transformer maps their nodes onto
+    models, and the writer flushes them every `write_batch_size` commits with
+    the cursor of the last page of the batch. Bounded queues keep memory flat
+    whatever the history size.
+
+    History cursors are sequential, so a single fetcher walks a given history;
+    Github and MySQL work overlap instead of alternating.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[str | None], Awaitable[dict]],
+        transform_page: Callable[[list[dict]], tuple[list[Commit], dict[str, GitUser]]],
+        write_batch: Callable[
+            [list[Commit], dict[str, GitUser], str | None, bool], Awaitable[None]
+        ],
+        cursor: str | None = None,
+        write_batch_size: int = COMMITS_WRITE_BATCH_SIZE,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ) -> None:
+        self.fetch_page = fetch_page
+        self.transform_page = transform_page
+        self.write_batch = write_batch
+        self.cursor = cursor
+        self.write_batch_size = write_batch_size
+        self.pages: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.stages = {
+            "fetch": StageStats(),
+            "transform": StageStats(),
+            "write": StageStats(),
+        }
+
+    async def __put(self, queue: asyncio.Queue, item, stage: StageStats):
+        start = time.perf_counter()
+        await queue.put(item)
+        stage.waiting_output_seconds += time.perf_counter() - start
+
+    async def __get(self, queue: asyncio.Queue, stage: StageStats):
+        start = time.perf_counter()
+        item = await queue.get()
+        stage.waiting_input_seconds += time.perf_counter() - start
+        return item
+
+    async def __fetch(self):
+        stage = self.stages["fetch"]
+        cursor = self.cursor
+        has_next_page = True
+        while has_next_page:
+            start = time.perf_counter()
+            page = await self.fetch_page(cursor)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.items += 1
+            has_next_page = bool(page["pageInfo"]["hasNextPage"])
+            cursor = page["pageInfo"]["endCursor"] or cursor
+            await self.__put(self.pages, (page["nodes"], cursor, has_next_page), stage)
+        await self.__put(self.pages, DONE, stage)
+
+    async def __transform(self):
+        stage = self.stages["transform"]
+        while (item := await self.__get(self.pages, stage)) is not DONE:
+            nodes, cursor, has_next_page = item
+            start = time.perf_counter()
+            commits, users = self.transform_page(nodes)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.items += len(commits)
+            await self.__put(
+                self.batches, (commits, users, cursor, has_next_page), stage
+            )
+        await self.__put(self.batches, DONE, stage)
+
+    async def __write(self):
+        stage = self.stages["write"]
+        commits: list[Commit] = list()
+        users: dict[str, GitUser] = dict()
+        while (item := await self.__get(self.batches, stage)) is not DONE:
+            page_commits, page_users, cursor, has_next_page = item
+            commits.extend(page_commits)
+            users.update(page_users)
+            if len(commits) < self.write_batch_size and has_next_page:
+                continue
+            start = time.perf_counter()
+            await self.write_batch(commits, users, cursor, not has_next_page)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.items += len(commits)
+            commits, users = list(), dict()
+
+    async def run(self):
+        """Run the three stages until the history is written, or one fails."""
+        tasks = [
+            asyncio.create_task(stage())
+            for stage in (self.__fetch, self.__transform, self.__write)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def metrics(self) -> dict[str, object]:
+        return {name: stage.metrics() for name, stage in self.stages.items()}
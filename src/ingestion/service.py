@@ -0,0 +1,563 @@
+import json
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from pymysql.err import IntegrityError
+
+from _config import GITHUB_CACHE_TTL, DateTimeFormat, base_logger
+from _database_pymysql import AsyncMysqlClient
+from _exceptions import (
+    AlreadyExistsException,
+    NotFoundException,
+    WrongAttributesException,
+)
+from _github_api import GithubClient, GithubPriority
+from models import Commit, GitOrganization, GitUser, Repository
+
+from .authors import AuthorIdentityCache, get_author_identity_cache
+from .config import COMMITS_WRITE_BATCH_SIZE, HISTORY_PAGE_SIZE
+from .exceptions import TrackedBranchNotFoundError
+from .pipeline import CommitPipeline
+from .utils import commit_from_node, git_user_from_actor
+
+# everything add_repository needs from Github, in a single round trip. email is
+# nullable on Organization but not on User, the same name on both fragments
+# would be rejected as a field conflict, hence the aliases
+TRACK_REPOSITORY_QUERY = """
+query ($owner: String!, $name: String!, $branchRef: String!) {
+    repository(owner: $owner, name: $name) {
+        id
+        isPrivate
+        createdAt
+        owner {
+            __typename
+            ... on Organization {
+                avatarUrl
+                orgEmail: email
+                id
+                login
+                name
+            }
+            ... on User {
+                avatarUrl
+                userEmail: email
+                id
+                login
+                name
+            }
+        }
+        trackedBranch: ref(qualifiedName: $branchRef) {
+            target {
+                ... on Commit {
+                    id
+                }
+            }
+        }
+    }
+}
+"""
+
+
+# the tracked branch of a repository node, loaded through a node loader so the
+# head checks of the syncs running at the same time share a single request
+BRANCH_HEAD_FRAGMENT = """
+... on Repository {
+    trackedBranch: ref(qualifiedName: %s) {
+        target {
+            ... on Commit {
+                id
+            }
+        }
+    }
+}
+"""
+
+COMMIT_FIELDS = """
+fragment CommitFields on Commit {
+    id
+    additions
+    deletions
+    authoredDate
+    committedDate
+    author {
+        avatarUrl
+        email
+        name
+        user {
+            avatarUrl
+            email
+            id
+            login
+            name
+        }
+    }
+    committer {
+        avatarUrl
+        email
+        name
+        user {
+            avatarUrl
+            email
+            id
+            login
+            name
+        }
+    }
+}
+"""
+
+# history walked from a fixed commit, so a checkpoint cursor stays valid when
+# the branch moves between two runs
+HISTORY_QUERY = (
+    """
+query ($headId: ID!, $first: Int!, $after: String) {
+    node(id: $headId) {
+        ... on Commit {
+            history(first: $first, after: $after) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                nodes {
+                    ...CommitFields
+                }
+            }
+        }
+    }
+}
+"""
+    + COMMIT_FIELDS
+)
+
+
+async def add_repository(
+    name: str,
+    owner_login: str,
+    branch_name: str,
+    mysql_client: AsyncMysqlClient,
+    github_client: GithubClient,
+) -> dict[str, object]:
+    base_logger.info(f"adding repository with {name=}, {owner_login=}, {branch_name=}")
+
+    ## 1. Call Github to get the repo, its owner and its branch at once, cached so
+    # that retried and repeated additions do not spend points again
+    branch_ref = "refs/heads/" + branch_name
+    variables = {"owner": owner_login, "name": name, "branchRef": branch_ref}
+    repo_info = (
+        await github_client.graphql_post(
+            query=TRACK_REPOSITORY_QUERY,
+            variables=variables,
+            cache_ttl=GITHUB_CACHE_TTL,
+        )
+    )["repository"]
+    if not repo_info or not repo_info["trackedBranch"]:
+        # the repository or branch may be created any time, do not keep the miss
+        github_client.uncache(query=TRACK_REPOSITORY_QUERY, variables=variables)
+    if not repo_info:
+        message = f"could not retreive any repository info for {name=}, {owner_login=}"
+        base_logger.warning(message)
+        raise WrongAttributesException(message)
+
+    # 1.1 Check if branch is valid
+    if not repo_info["trackedBranch"]:
+        message = (
+            f"could not retreive any info with {name=}, {owner_login=}, {branch_name=}"
+        )
+        base_logger.warning(message)
+        raise WrongAttributesException(message)
+
+    # 1.2 Build repo
+    owner_info = repo_info["owner"]
+    is_organization = owner_info["__typename"] == "Organization"
+    repo = Repository(
+        id=repo_info["id"],
+        name=name,
+        ownerIsOrganization=is_organization,
+        ownerIdOrganization=(owner_info["id"] if is_organization else None),
+        ownerIdUser=(owner_info["id"] if not is_organization else None),
+        isPrivate=bool(repo_info["isPrivate"]),
+        createdAt=datetime.strptime(repo_info["createdAt"], DateTimeFormat.github),
+        trackedBranchName=branch_name,
+        trackedBranchRef=branch_ref,
+        rootCommitIsReached=False,
+    )
+    base_logger.debug(f"created object {repo.to_dict()=}")
+
+    ## 2. Build owner
+    owner_model = GitOrganization if is_organization else GitUser
+    github_owner = owner_model(
+        id=owner_info["id"],
+        avatarUrl=owner_info["avatarUrl"],
+        email=owner_info["orgEmail" if is_organization else "userEmail"],
+        name=owner_info["name"],
+        login=owner_info["login"],
+    )
+    base_logger.debug(f"got {github_owner.to_dict()=}")
+
+    # 2.2 Add user if not present, and 3. add repo, in one transaction
+    base_logger.debug(f"adding github user and repo in db, {repo.to_dict()=}")
+    try:
+        async with mysql_client.transaction():
+            await mysql_client.insert_one(
+                table_name=(
+                    GitOrganization.__tablename__
+                    if repo.ownerIsOrganization
+                    else GitUser.__tablename__
+                ),
+                values=github_owner.to_dict(),
+                or_ignore=True,
+            )
+            await mysql_client.insert_one(
+                table_name=Repository.__tablename__, values=repo.to_dict()
+            )
+    except IntegrityError as e:
+        raise AlreadyExistsException(table_name=Repository.__tablename__, detail=str(e))
+    base_logger.debug(f"successfully added to db {repo.to_dict()=}")
+
+    # 4. Return created one
+    return repo.to_dict()
+
+
+async def get_branch_head_id(
+    repo: dict[str, object], github_client: GithubClient
+) -> str:
+    # repositories tracking the same branch name share a loader, and a batch
+    loader = github_client.node_loader(
+        fragment=BRANCH_HEAD_FRAGMENT % json.dumps(repo["trackedBranchRef"]),
+        priority=GithubPriority.background,
+    )
+    node = await loader.load(str(repo["id"]))
+    branch = (node or dict()).get("trackedBranch")
+    if not branch or not branch["target"]:
+        raise TrackedBranchNotFoundError(
+            repo_id=str(repo["id"]), branch_ref=str(repo["trackedBranchRef"])
+        )
+    return branch["target"]["id"]
+
+
+async def fetch_history_page(
+    repo: dict[str, object],
+    head_id: str,
+    github_client: GithubClient,
+    page_size: int,
+    cursor: str | None = None,
+) -> dict:
+    """One page of the history of `head_id`, with its pageInfo and nodes."""
+    data = await github_client.graphql_post(
+        query=HISTORY_QUERY,
+        variables={
+            "headId": head_id,
+            "first": page_size,
+            "after": cursor,
+        },
+        priority=GithubPriority.background,
+        silent=True,
+    )
+    if not data["node"]:
+        raise TrackedBranchNotFoundError(
+            repo_id=str(repo["id"]), branch_ref=str(repo["trackedBranchRef"])
+        )
+    return data["node"]["history"]
+
+
+def add_history_nodes(
+    nodes: list[dict],
+    repo_id: str,
+    commits: list[Commit],
+    users: dict[str, GitUser],
+    authors: AuthorIdentityCache | None = None,
+):
+    for node in nodes:
+        commit = commit_from_node(node=node, repo_id=repo_id)
+        if authors:
+            authors.resolve(commit)
+        commits.append(commit)
+        for actor in (node.get("author"), node.get("committer")):
+            user = git_user_from_actor(actor)
+            if user:
+                users[user.id] = user
+
+
+async def write_commits(
+    repo_id: str,
+    commits: list[Commit],
+    users: dict[str, GitUser],
+    checkpoint: dict[str, object],
+    mysql_client: AsyncMysqlClient,
+    authors: AuthorIdentityCache | None = None,
+):
+    """Write a batch of commits with their users and the repository checkpoint.
+
+    Everything goes in one transaction, so the checkpoint never points past
+    commits that are not in the database. Users `authors` already knows are not
+    written again.
+    """
+    new_users = authors.unknown(users) if authors else list(users.values())
+    async with mysql_client.transaction():
+        if new_users:
+            await mysql_client.insert_many(
+                table_name=GitUser.__tablename__,
+                values=[user.to_dict() for user in new_users],
+                or_ignore=True,
+                silent=True,
+            )
+        if commits:
+            await mysql_client.insert_many(
+                table_name=Commit.__tablename__,
+                values=[commit.to_dict() for commit in commits],
+                or_ignore=True,
+                silent=True,
+            )
+        if checkpoint:
+            await mysql_client.update(
+                table_name=Repository.__tablename__,
+                update_col_value=checkpoint,
+                cond_eq={"id": repo_id},
+            )
+    if authors:
+        authors.mark_written(new_users)
+
+
+async def backfill_repository(
+    repo_id: str,
+    mysql_client: AsyncMysqlClient,
+    github_client: GithubClient,
+    page_size: int = HISTORY_PAGE_SIZE,
+    write_batch_size: int = COMMITS_WRITE_BATCH_SIZE,
+    on_progress: Callable[[dict[str, object]], Awaitable[None]] | None = None,
+) -> dict[str, object]:
+    """Walk the tracked branch history back to the root commit.
+
+    Pages are fetched as background Github calls by a CommitPipeline, ahead of
+    the writes, and written every `write_batch_size` commits together with the
+    checkpoint, so an interrupted backfill resumes from its last written page.
+    rootCommitIsReached is set with the last batch, and the commit the backfill
+    started from becomes the synced head used by sync_repository. `on_progress`
+    is awaited with the stats after every write.
+
+    Returns
+    -------
+    dict
+        Backfill stats, including its throughput in commits per second and the
+        throughput of each pipeline stage
+    """
+    base_logger.info(f"backfilling commits of {repo_id=}")
+    repo = await mysql_client.select_by_id(
+        table_name=Repository.__tablename__, id=repo_id
+    )
+    if not repo:
+        raise NotFoundException(table_name=Repository.__tablename__, detail=repo_id)
+
+    stats: dict[str, object] = {
+        "repositoryId": repo_id,
+        "commits": 0,
+        "pages": 0,
+        "seconds": 0.0,
+        "commitsPerSecond": 0.0,
+        "rootCommitIsReached": bool(repo["rootCommitIsReached"]),
+    }
+    if repo["rootCommitIsReached"]:
+        base_logger.info(f"root commit already reached for {repo_id=}")
+        return stats
+
+    start = time.perf_counter()
+    authors = get_author_identity_cache()
+    await authors.warm(repo_id=repo_id, mysql_client=mysql_client)
+    head_id = repo["backfillHeadId"]
+    cursor = repo["backfillCursor"]
+    if not head_id:
+        head_id = await get_branch_head_id(repo=repo, github_client=github_client)
+        cursor = None
+        await mysql_client.update(
+            table_name=Repository.__tablename__,
+            update_col_value={"backfillHeadId": head_id},
+            cond_eq={"id": repo_id},
+        )
+
+    async def fetch_page(page_cursor: str | None) -> dict:
+        return await fetch_history_page(
+            repo=repo,
+            head_id=head_id,  # type: ignore
+            github_client=github_client,
+            page_size=page_size,
+            cursor=page_cursor,
+        )
+
+    def transform_page(nodes: list[dict]) -> tuple[list[Commit], dict[str, GitUser]]:
+        commits: list[Commit] = list()
+        users: dict[str, GitUser] = dict()
+        add_history_nodes(
+            nodes=nodes, repo_id=repo_id, commits=commits, users=users, authors=authors
+        )
+        return commits, users
+
+    async def write_batch(
+        commits: list[Commit],
+        users: dict[str, GitUser],
+        batch_cursor: str | None,
+        done: bool,
+    ):
+        checkpoint = {"backfillCursor": batch_cursor, "rootCommitIsReached": done}
+        if done and not repo["syncedHeadId"]:
+            checkpoint["syncedHeadId"] = head_id
+        await write_commits(
+            repo_id=repo_id,
+            commits=commits,
+            users=users,
+            checkpoint=checkpoint,
+            mysql_client=mysql_client,
+            authors=authors,
+        )
+        stats["commits"] += len(commits)  # type: ignore
+        stats["pages"] = pipeline.stages["fetch"].items
+        base_logger.debug(f"wrote {len(commits)} commits of {repo_id=}")
+        if on_progress:
+            await on_progress(stats)
+
+    pipeline = CommitPipeline(
+        fetch_page=fetch_page,
+        transform_page=transform_page,
+        write_batch=write_batch,
+        cursor=cursor,  # type: ignore
+        write_batch_size=write_batch_size,
+    )
+    await pipeline.run()
+
+    stats["pages"] = pipeline.stages["fetch"].items
+    stats["stages"] = pipeline.metrics()
+    seconds = time.perf_counter() - start
+    commit_count: int = stats["commits"]  # type: ignore
+    stats["seconds"] = seconds
+    stats["commitsPerSecond"] = commit_count / seconds if seconds else 0.0
+    stats["rootCommitIsReached"] = True
+    base_logger.info(f"backfilled commits of {repo_id=}, {stats=}")
+    return stats
+
+
+async def sync_repository(
+    repo_id: str,
+    mysql_client: AsyncMysqlClient,
+    github_client: GithubClient,
+    page_size: int = HISTORY_PAGE_SIZE,
+    write_batch_size: int = COMMITS_WRITE_BATCH_SIZE,
+    on_progress: Callable[[dict[str, object]], Awaitable[None]] | None = None,
+) -> dict[str, object]:
+    """Fetch the commits pushed on the tracked branch since the last sync.
+
+    A repository never synced is backfilled instead. Otherwise the branch head
+    is checked first, an unchanged head costing a single small query. When it
+    moved, history is read from the new head and the commits already in the
+    database are skipped. Commits merged from another branch keep their own
+    dates, so they can be listed after the synced head: reading goes on past it,
+    until a page without any new commit. A merged commit listed more than a
+    full page of known commits after the synced head is missed, it is only
+    picked up by a new backfill. Commits are written every `write_batch_size`,
+    the synced head is moved last. `on_progress` is awaited with the stats
+    after every write.
+
+    Pages are read one after the other, not through a CommitPipeline: whether
+    the next page is read depends on the commits of this one already in the
+    database, and a sync rarely fills more than one write batch, so there are
+    no writes for the fetches to overlap with.
+
+    Returns
+    -------
+    dict
+        Sync stats, including its throughput in commits per second
+    """
+    base_logger.info(f"syncing commits of {repo_id=}")
+    repo = await mysql_client.select_by_id(
+        table_name=Repository.__tablename__, id=repo_id
+    )
+    if not repo:
+        raise NotFoundException(table_name=Repository.__tablename__, detail=repo_id)
+    if not repo["rootCommitIsReached"]:
+        return await backfill_repository(
+            repo_id=repo_id,
+            mysql_client=mysql_client,
+            github_client=github_client,
+            page_size=page_size,
+            write_batch_size=write_batch_size,
+            on_progress=on_progress,
+        )
+
+    start = time.perf_counter()
+    stats: dict[str, object] = {
+        "repositoryId": repo_id,
+        "commits": 0,
+        "pages": 0,
+        "seconds": 0.0,
+        "commitsPerSecond": 0.0,
+        "upToDate": False,
+    }
+    synced_head_id = repo["syncedHeadId"] or repo["backfillHeadId"]
+    head_id = await get_branch_head_id(repo=repo, github_client=github_client)
+    if head_id == synced_head_id:
+        base_logger.info(f"tracked branch of {repo_id=} did not move")
+        stats["upToDate"] = True
+        return stats
+
+    authors = get_author_identity_cache()
+    await authors.warm(repo_id=repo_id, mysql_client=mysql_client)
+    commits: list[Commit] = list()
+    users: dict[str, GitUser] = dict()
+    cursor = None
+    reached_synced_head = not synced_head_id
+    done = False
+    while not done:
+        history = await fetch_history_page(
+            repo=repo,
+            head_id=head_id,
+            github_client=github_client,
+            page_size=page_size,
+            cursor=cursor,
+        )
+        stats["pages"] += 1  # type: ignore
+        nodes: list[dict] = history["nodes"]
+        known_ids = set()
+        if nodes:
+            known = await mysql_client.select(
+                table_name=Commit.__tablename__,
+                select_col=["id"],
+                cond_eq={"repositoryId": repo_id},
+                cond_in={"id": [node["id"] for node in nodes]},
+                silent=True,
+            )
+            known_ids = {row["id"] for row in known}
+        new_nodes = [node for node in nodes if node["id"] not in known_ids]
+        add_history_nodes(
+            nodes=new_nodes,
+            repo_id=repo_id,
+            commits=commits,
+            users=users,
+            authors=authors,
+        )
+        reached_synced_head = reached_synced_head or any(
+            node["id"] == synced_head_id for node in nodes
+        )
+        has_next_page = bool(history["pageInfo"]["hasNextPage"])
+        cursor = history["pageInfo"]["endCursor"] or cursor
+
+        done = not has_next_page or (reached_synced_head and not new_nodes)
+        if len(commits) >= write_batch_size or done:
+            await write_commits(
+                repo_id=repo_id,
+                commits=commits,
+                users=users,
+                checkpoint={"syncedHeadId": head_id} if done else dict(),
+                mysql_client=mysql_client,
+                authors=authors,
+            )
+            stats["commits"] += len(commits)  # type: ignore
+            commits, users = list(), dict()
+            if on_progress:
+                await on_progress(stats)
+
+    seconds = time.perf_counter() - start
+    commit_count: int = stats["commits"]  # type: ignore
+    stats["seconds"] = seconds
+    stats["commitsPerSecond"] = commit_count / seconds if seconds else 0.0
+    stats["upToDate"] = True
+    base_logger.info(f"synced commits of {repo_id=}, {stats=}")
+    return stats
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from models import Commit, GitUser
+
+
+def parse_github_datetime(date: str) -> datetime:
+    """Github git timestamps may carry an offset, store them as naive UTC."""
+    parsed = datetime.fromisoformat(date)
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def git_user_from_actor(actor: dict | None) -> GitUser | None:
+    """The git_user behind a commit author or committer, None if not on Github."""
+    if not actor or not actor.get("user"):
+        return None
+    user = actor["user"]
+    return GitUser(
+        id=user["id"],
+        avatarUrl=user["avatarUrl"],
+        email=user["email"] or None,
+        name=user["name"],
+        login=user["login"],
+    )
+
+
+def commit_from_node(node: dict, repo_id: str) -> Commit:
+    author = node.get("author") or dict()
+    committer = node.get("committer") or dict()
+    author_user = author.get("user") or dict()
+    committer_user = committer.get("user") or dict()
+    return Commit(
+        id=node["id"],
+        repositoryId=repo_id,
+        additions=node["additions"],
+        deletions=node["deletions"],
+        authoredDate=parse_github_datetime(node["authoredDate"]),
+        authorAvatarUrl=author.get("avatarUrl"),
+        authorEmail=author.get("email") or "",
+        authorId=author_user.get("id"),
+        authorName=author.get("name") or "",
+        committedDate=parse_github_datetime(node["committedDate"]),
+        committerAvatarUrl=committer.get("avatarUrl"),
+        committerEmail=committer.get("email") or "",
+        committerId=committer_user.get("id"),
+        committerName=committer.get("name") or "",
+    )
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
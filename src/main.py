@@ -5,10 +5,29 @@ root_path = Path(__file__).resolve().parent
 sys.path.append(str(root_path))
 
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from _database_pymysql import close_mysql_executor, close_mysql_pool
+from _github_api import close_github_client, get_github_client
 from api import api_router
+from ingestion import start_ingestion_workers, stop_ingestion_workers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fails fast, before serving anything, when no Github token is set
+    get_github_client()
+    start_ingestion_workers()
+    yield
+    await stop_ingestion_workers()
+    await close_github_client()
+    close_mysql_executor()
+    close_mysql_pool()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(api_router)
@@ -1,4 +1,5 @@
 from .commit import Commit
 from .git_organization import GitOrganization
 from .git_user import GitUser
+from .ingestion_job import IngestionJob
 from .repository import Repository
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DATETIME, INTEGER, VARCHAR, ForeignKey
+from sqlalchemy import DATETIME, INTEGER, VARCHAR, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from _models import BaseModel
@@ -11,6 +11,14 @@ from .repository import Repository
 
 class Commit(BaseModel):
     __tablename__ = "commit"
+    __table_args__ = (
+        Index(
+            "ix_commit_repositoryId_committedDate_id",
+            "repositoryId",
+            "committedDate",
+            "id",
+        ),
+    )
 
     id: Mapped[str] = mapped_column(VARCHAR(255), primary_key=True)
     oldId: Mapped[str] = mapped_column(
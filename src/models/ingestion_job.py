@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import DATETIME, INTEGER, TEXT, VARCHAR, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from _models import BaseModel
+
+
+class IngestionJob(BaseModel):
+    __tablename__ = "ingestion_job"
+    __table_args__ = (
+        Index("ix_ingestion_job_status_createdAt", "status", "createdAt"),
+    )
+
+    id: Mapped[str] = mapped_column(VARCHAR(255), primary_key=True)
+    kind: Mapped[str] = mapped_column(VARCHAR(64), nullable=False)
+    status: Mapped[str] = mapped_column(VARCHAR(32), nullable=False)
+    # not a foreign key, the repository of a tracking job does not exist yet
+    repositoryId: Mapped[str] = mapped_column(
+        VARCHAR(255), nullable=True, server_default=None, index=True
+    )
+
+    # json
+    payload: Mapped[str] = mapped_column(TEXT(), nullable=True, server_default=None)
+    progress: Mapped[str] = mapped_column(TEXT(), nullable=True, server_default=None)
+    error: Mapped[str] = mapped_column(TEXT(), nullable=True, server_default=None)
+    attempts: Mapped[int] = mapped_column(INTEGER(), nullable=False, server_default="0")
+
+    createdAt: Mapped[datetime] = mapped_column(DATETIME(), nullable=False)
+    updatedAt: Mapped[datetime] = mapped_column(DATETIME(), nullable=False)
+    startedAt: Mapped[datetime] = mapped_column(
+        DATETIME(), nullable=True, server_default=None
+    )
+    finishedAt: Mapped[datetime] = mapped_column(
+        DATETIME(), nullable=True, server_default=None
+    )
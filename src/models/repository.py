@@ -27,6 +27,18 @@ class Repository(BaseModel):
 
     trackedBranchName: Mapped[str] = mapped_column(VARCHAR(255), nullable=False)
     trackedBranchRef: Mapped[str] = mapped_column(VARCHAR(255), nullable=False)
+    # history backfill checkpoint, the commit it started from and the cursor
+    # of the last page written
+    backfillHeadId: Mapped[str] = mapped_column(
+        VARCHAR(255), nullable=True, server_default=None
+    )
+    backfillCursor: Mapped[str] = mapped_column(
+        VARCHAR(255), nullable=True, server_default=None
+    )
+    # head of the tracked branch when commits were last synced
+    syncedHeadId: Mapped[str] = mapped_column(
+        VARCHAR(255), nullable=True, server_default=None
+    )
 
     ownerIsOrganization: Mapped[bool] = mapped_column(
         TINYINT(1), nullable=False, index=True
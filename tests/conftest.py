@@ -0,0 +1,129 @@
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pymysql.converters
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import _database_pymysql  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection") -> None:
+        self.connection = connection
+        self.rowcount = 0
+        self._executed = None
+        self._rows: list[dict[str, object]] = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query: str, args=None) -> int:
+        query = " ".join(query.split())
+        self._executed = (query, args)
+        self.connection.queries.append((query, args))
+        with self.connection.call(query):
+            self._rows = list(self.connection.responder(query, args))
+        self.rowcount = len(self._rows)
+        return self.rowcount
+
+    def fetchall(self) -> tuple[dict[str, object], ...]:
+        return tuple(self._rows)
+
+    def fetchmany(self, size: int) -> list[dict[str, object]]:
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """pymysql connection answering queries from `responder` and recording them.
+
+    `calls` lists the statements and transaction calls in order, `overlapping`
+    the ones that started while another was still running.
+    """
+
+    def __init__(self, responder) -> None:
+        self.responder = responder
+        self.open = True
+        self.queries: list[tuple[str, object]] = list()
+        self.calls: list[str] = list()
+        self.overlapping: list[str] = list()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def call(self, name: str) -> Iterator[None]:
+        with self._lock:
+            if self._running:
+                self.overlapping.append(name)
+            self._running += 1
+            self.calls.append(name)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def cursor(self, cursor_class=None) -> FakeCursor:
+        return FakeCursor(self)
+
+    def ping(self, reconnect: bool = False):
+        pass
+
+    def begin(self):
+        with self.call("BEGIN"):
+            pass
+
+    def commit(self):
+        with self.call("COMMIT"):
+            pass
+
+    def rollback(self):
+        with self.call("ROLLBACK"):
+            pass
+
+    def close(self):
+        self.open = False
+
+    def escape(self, obj, mapping=None):
+        return pymysql.converters.escape_item(obj, "utf8mb4", mapping)
+
+
+class FakeDatabase:
+    """What the pooled clients of the tests connect to.
+
+    Set `responder`, a function of the query and its args returning rows, then
+    count the queries run through `queries`.
+    """
+
+    def __init__(self) -> None:
+        self.responder = lambda query, args: list()
+        self.connections: list[FakeConnection] = list()
+
+    def connect(self) -> FakeConnection:
+        connection = FakeConnection(lambda q, a: self.responder(q, a))
+        self.connections.append(connection)
+        return connection
+
+    @property
+    def queries(self) -> list[tuple[str, object]]:
+        return [q for connection in self.connections for q in connection.queries]
+
+
+@pytest.fixture
+def fake_db(monkeypatch) -> Iterator[FakeDatabase]:
+    database = FakeDatabase()
+    monkeypatch.setattr(_database_pymysql, "connect_mysql", database.connect)
+    _database_pymysql.close_mysql_pool()
+    yield database
+    _database_pymysql.close_mysql_pool()
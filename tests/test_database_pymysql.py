@@ -0,0 +1,248 @@
+import asyncio
+import re
+import time
+
+import pytest
+
+import _database_pymysql
+from _config import base_logger
+from _database_pymysql import (
+    AsyncMysqlClient,
+    MysqlClient,
+    MysqlConnectionPool,
+    MySqlNoTransactionError,
+    MySqlPoolExhaustedError,
+    get_mysql_pool,
+)
+
+
+async def connect() -> AsyncMysqlClient:
+    return await AsyncMysqlClient.connect(logger=base_logger, pool=get_mysql_pool())
+
+
+def slow_inserts(query: str, args) -> list[dict[str, object]]:
+    if query.startswith("INSERT"):
+        time.sleep(0.2)
+    return list()
+
+
+def test_run_waits_for_a_cancelled_call(fake_db):
+    fake_db.responder = slow_inserts
+
+    async def cancel_then_select():
+        mysql_client = await connect()
+        insert = asyncio.create_task(mysql_client.execute(query="INSERT INTO t;"))
+        await asyncio.sleep(0.05)
+        insert.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await insert
+        await mysql_client.execute(query="SELECT 1;")
+        await mysql_client.close()
+
+    asyncio.run(cancel_then_select())
+
+    connection = fake_db.connections[0]
+    assert connection.overlapping == list()
+    assert [q for q, _ in fake_db.queries] == ["INSERT INTO t;", "SELECT 1;"]
+
+
+def transaction_calls(fake_db) -> list[str]:
+    calls = fake_db.connections[0].calls
+    # the rollback of the pool checkin is not part of the scope
+    return calls[:-1] if calls and calls[-1] == "ROLLBACK" else calls
+
+
+def test_transaction_commits_once_on_exit(fake_db):
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    with mysql_client.transaction():
+        mysql_client.insert_one(table_name="t", values={"id": 1})
+        mysql_client.insert_one(table_name="t", values={"id": 2})
+    mysql_client.close()
+
+    calls = transaction_calls(fake_db)
+    assert calls[0] == "BEGIN"
+    assert calls[-1] == "COMMIT"
+    assert calls.count("COMMIT") == 1
+
+
+def test_nested_transaction_rolls_back_to_its_savepoint(fake_db):
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    with mysql_client.transaction():
+        with pytest.raises(ValueError):
+            with mysql_client.transaction():
+                mysql_client.insert_one(table_name="t", values={"id": 1})
+                raise ValueError()
+        with mysql_client.transaction():
+            mysql_client.insert_one(table_name="t", values={"id": 2})
+    mysql_client.close()
+
+    calls = [c for c in transaction_calls(fake_db) if not c.startswith("INSERT")]
+    assert calls == [
+        "BEGIN",
+        "SAVEPOINT sp_1;",
+        "ROLLBACK TO SAVEPOINT sp_1;",
+        "SAVEPOINT sp_1;",
+        "RELEASE SAVEPOINT sp_1;",
+        "COMMIT",
+    ]
+    assert mysql_client.transaction_depth == 0
+
+
+def test_transaction_rolls_back_on_error(fake_db):
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    with pytest.raises(ValueError):
+        with mysql_client.transaction():
+            mysql_client.insert_one(table_name="t", values={"id": 1})
+            raise ValueError()
+    mysql_client.close()
+
+    calls = transaction_calls(fake_db)
+    assert calls[0] == "BEGIN"
+    assert calls[-1] == "ROLLBACK"
+    assert "COMMIT" not in calls
+
+
+def test_end_transaction_without_scope_raises(fake_db):
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    with pytest.raises(MySqlNoTransactionError):
+        mysql_client.end_transaction()
+    mysql_client.close()
+
+
+def test_cancelled_transaction_rolls_back_after_its_statement(fake_db):
+    fake_db.responder = slow_inserts
+
+    async def cancel_transaction():
+        mysql_client = await connect()
+
+        async def write():
+            async with mysql_client.transaction():
+                await mysql_client.execute(query="INSERT INTO t;")
+
+        task = asyncio.create_task(write())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await mysql_client.close()
+
+    asyncio.run(cancel_transaction())
+
+    connection = fake_db.connections[0]
+    assert connection.overlapping == list()
+    assert transaction_calls(fake_db) == ["BEGIN", "INSERT INTO t;", "ROLLBACK"]
+
+
+def test_pool_reuses_checked_in_connections(fake_db):
+    pool = MysqlConnectionPool(min_size=0, max_size=2)
+    connection = pool.checkout()
+    pool.checkin(connection)
+
+    assert pool.checkout() is connection
+    assert pool.stats()["created"] == 1
+    assert connection.calls == ["ROLLBACK"]
+
+
+def test_pool_times_out_when_exhausted(fake_db):
+    pool = MysqlConnectionPool(min_size=0, max_size=1, timeout=0.05)
+    pool.checkout()
+
+    with pytest.raises(MySqlPoolExhaustedError):
+        pool.checkout()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_discard_frees_a_slot(fake_db):
+    pool = MysqlConnectionPool(min_size=0, max_size=1, timeout=0.05)
+    connection = pool.checkout()
+    pool.discard(connection)
+
+    assert not connection.open
+    assert pool.checkout() is not connection
+    assert pool.stats()["discarded"] == 1
+
+
+def test_pool_replaces_closed_and_expired_connections(fake_db):
+    pool = MysqlConnectionPool(min_size=0, max_size=2, max_lifetime=60)
+    closed = pool.checkout()
+    closed.open = False
+    pool.checkin(closed)
+    expired = pool.checkout()
+    pool.max_lifetime = 0
+    pool.checkin(expired)
+
+    assert pool.stats()["discarded"] == 2
+    assert pool.stats()["idle"] == 0
+
+
+def small_packets(query: str, args) -> list[dict[str, object]]:
+    if "@@max_allowed_packet" in query:
+        return [{"max_allowed_packet": 2048}]
+    return list()
+
+
+def test_insert_many_splits_rows_by_max_allowed_packet(fake_db, monkeypatch):
+    monkeypatch.setattr(_database_pymysql, "_max_allowed_packet", None)
+    fake_db.responder = small_packets
+    rows = [{"id": i, "name": "x" * 100} for i in range(30)]
+
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    mysql_client.insert_many(table_name="t", values=rows)
+    mysql_client.close()
+
+    inserts = [q for q, _ in fake_db.queries if q.startswith("INSERT")]
+    assert len(inserts) > 1
+    assert all(len(query.encode()) <= 2048 for query in inserts)
+    inserted = [int(v) for q in inserts for v in re.findall(r"\((\d+),", q)]
+    assert inserted == list(range(30))
+    # the packet size is asked once, then every statement is committed
+    calls = fake_db.connections[0].calls
+    assert [q for q, _ in fake_db.queries].count(
+        "SELECT @@max_allowed_packet AS max_allowed_packet;"
+    ) == 1
+    assert calls.count("COMMIT") == len(inserts)
+
+
+def test_insert_many_sends_a_row_larger_than_the_budget_alone(fake_db, monkeypatch):
+    monkeypatch.setattr(_database_pymysql, "_max_allowed_packet", None)
+    fake_db.responder = small_packets
+    rows = [
+        {"id": 0, "name": "x"},
+        {"id": 1, "name": "x" * 2000},
+        {"id": 2, "name": "x"},
+    ]
+
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    mysql_client.insert_many(table_name="t", values=rows)
+    mysql_client.close()
+
+    inserts = [q for q, _ in fake_db.queries if q.startswith("INSERT")]
+    assert [re.findall(r"\((\d+),", q) for q in inserts] == [["0"], ["1"], ["2"]]
+
+
+def test_closing_select_iter_early_discards_the_connection(fake_db):
+    fake_db.responder = lambda query, args: [{"id": i} for i in range(10)]
+    pool = get_mysql_pool()
+    mysql_client = MysqlClient(logger=base_logger, pool=pool)
+    connection = mysql_client.connection
+
+    batches = mysql_client.select_iter(table_name="t", batch_size=2)
+    assert next(batches) == ({"id": 0}, {"id": 1})
+    batches.close()
+
+    assert mysql_client.connection is None
+    assert not connection.open
+    assert pool.stats()["discarded"] == 1
+
+
+def test_exhausted_select_iter_keeps_the_connection(fake_db):
+    fake_db.responder = lambda query, args: [{"id": i} for i in range(5)]
+    mysql_client = MysqlClient(logger=base_logger, pool=get_mysql_pool())
+    connection = mysql_client.connection
+
+    batches = list(mysql_client.select_iter(table_name="t", batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert mysql_client.connection is connection
+    assert connection.open
+    mysql_client.close()
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from _exceptions import WrongAttributesException
+from _github_api import (
+    CircuitState,
+    GithubCircuitBreaker,
+    GithubCircuitOpenError,
+    GithubClient,
+    GithubPriority,
+    GithubRateLimiter,
+)
+from ingestion.service import add_repository
+
+
+def test_interactive_call_skips_background_calls_held_by_the_reserve():
+    async def acquire_both() -> tuple[bool, bool]:
+        limiter = GithubRateLimiter(limit=5000, background_reserve=500)
+        limiter.remaining = 400.0
+        background = asyncio.create_task(
+            limiter.acquire(priority=GithubPriority.background)
+        )
+        await asyncio.sleep(0)
+        await asyncio.wait_for(limiter.acquire(), timeout=0.5)
+        await asyncio.sleep(0.05)
+        background_granted = background.done()
+        background.cancel()
+        return background_granted, limiter.remaining == 399.0
+
+    background_granted, interactive_granted = asyncio.run(acquire_both())
+
+    assert not background_granted
+    assert interactive_granted
+
+
+def test_waiting_calls_are_granted_in_priority_order():
+    async def grant_order() -> list[str]:
+        limiter = GithubRateLimiter(limit=1, background_reserve=0)
+        limiter.exhaust(0.1)
+        granted: list[str] = list()
+
+        async def acquire(name: str, priority: int):
+            await limiter.acquire(priority=priority)
+            granted.append(name)
+
+        tasks = [
+            asyncio.create_task(acquire("background", GithubPriority.background)),
+            asyncio.create_task(acquire("interactive", GithubPriority.interactive)),
+        ]
+        await asyncio.wait(tasks, timeout=0.5)
+        for task in tasks:
+            task.cancel()
+        return granted
+
+    assert asyncio.run(grant_order()) == ["interactive"]
+
+
+def counting_github_client(data: dict[str, object]) -> tuple[GithubClient, list]:
+    requests: list[dict] = list()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"data": data})
+
+    transport = httpx.MockTransport(handle)
+    client = GithubClient(
+        token="fake", http_client=httpx.AsyncClient(transport=transport)
+    )
+    return client, requests
+
+
+def test_cached_query_is_sent_once():
+    github_client, requests = counting_github_client({"viewer": {"login": "me"}})
+
+    async def post_twice() -> list[dict]:
+        return [
+            await github_client.graphql_post(
+                query="query { viewer { login } }", cache_ttl=60
+            )
+            for _ in range(2)
+        ]
+
+    assert asyncio.run(post_twice()) == [{"viewer": {"login": "me"}}] * 2
+    assert len(requests) == 1
+    assert github_client.cache.metrics()["hits"] == 1
+
+
+def test_add_repository_does_not_cache_a_missing_branch():
+    repository = {
+        "id": "R_1",
+        "isPrivate": False,
+        "createdAt": "2024-01-01T00:00:00Z",
+        "owner": {"__typename": "User", "id": "U_1"},
+        "trackedBranch": None,
+    }
+    github_client, requests = counting_github_client({"repository": repository})
+
+    async def add_twice():
+        for _ in range(2):
+            with pytest.raises(WrongAttributesException):
+                await add_repository(
+                    name="repo",
+                    owner_login="owner",
+                    branch_name="main",
+                    mysql_client=None,  # type: ignore
+                    github_client=github_client,
+                )
+
+    asyncio.run(add_twice())
+
+    assert len(requests) == 2
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = GithubCircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.open
+    assert not breaker.allow()
+
+
+def test_breaker_lets_a_single_probe_through_once_reset():
+    breaker = GithubCircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitState.half_open
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitState.closed
+    assert breaker.allow()
+
+
+def test_breaker_opens_again_when_the_probe_fails():
+    breaker = GithubCircuitBreaker(failure_threshold=5, reset_timeout=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.open
+    assert not breaker.allow()
+
+
+def test_breaker_lets_a_new_probe_through_after_an_aborted_one():
+    breaker = GithubCircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_abort()
+
+    assert breaker.allow()
+
+
+def test_breaker_gives_up_a_probe_without_outcome():
+    breaker = GithubCircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitState.half_open
+
+
+def test_open_circuit_rejects_calls_without_spending_points():
+    github_client, requests = counting_github_client({"viewer": None})
+    github_client.breaker.state = CircuitState.open
+    github_client.breaker.opened_at = time.monotonic()
+    token = github_client.tokens.tokens[0]
+    remaining = token.rate_limiter.available()
+
+    with pytest.raises(GithubCircuitOpenError):
+        asyncio.run(github_client.graphql_post(query="query { viewer { login } }"))
+
+    assert requests == list()
+    assert token.requests == 0
+    assert token.rate_limiter.available() == remaining
+
+
+def test_retry_after_is_honoured_on_503():
+    statuses = [503, 200]
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        status = statuses.pop(0)
+        if status == 503:
+            return httpx.Response(503, headers={"retry-after": "0.3"})
+        return httpx.Response(200, json={"data": {"viewer": None}})
+
+    transport = httpx.MockTransport(handle)
+    github_client = GithubClient(
+        token="fake", http_client=httpx.AsyncClient(transport=transport)
+    )
+    github_client.backoff_base = 0.0
+
+    start = time.monotonic()
+    data = asyncio.run(github_client.graphql_post(query="query { viewer { login } }"))
+
+    assert data == {"viewer": None}
+    assert time.monotonic() - start >= 0.3
+
+
+def test_node_loader_batches_and_falls_back_to_single_ids():
+    batches: list[list[str]] = list()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        ids = json.loads(request.content)["variables"]["ids"]
+        batches.append(ids)
+        if "R_missing" in ids:
+            errors = [{"message": "Could not resolve to a node with the global id"}]
+            return httpx.Response(200, json={"data": None, "errors": errors})
+        return httpx.Response(200, json={"data": {"nodes": [{"id": i} for i in ids]}})
+
+    github_client = GithubClient(
+        token="fake",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+    )
+    loader = github_client.node_loader(fragment="... on Repository { id }")
+
+    async def load() -> list[dict | None]:
+        return await loader.load_many(["R_1", "R_missing", "R_2", "R_1"])
+
+    assert asyncio.run(load()) == [{"id": "R_1"}, None, {"id": "R_2"}, {"id": "R_1"}]
+    assert batches[0] == ["R_1", "R_missing", "R_2"]
+    assert sorted(batches[1:]) == [["R_1"], ["R_2"], ["R_missing"]]
+    assert loader.metrics() == {"loads": 4, "batches": 4, "fallbacks": 1}
+    assert github_client.node_loader(fragment="... on  Repository { id }") is loader
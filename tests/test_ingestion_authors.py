@@ -0,0 +1,79 @@
+import asyncio
+
+from _config import base_logger
+from _database_pymysql import AsyncMysqlClient, get_mysql_pool
+from ingestion.authors import AuthorIdentityCache
+from models import Commit, GitUser
+
+
+def commit(author_id: str | None, email: str) -> Commit:
+    return Commit(
+        authorId=author_id,
+        authorEmail=email,
+        committerId=author_id,
+        committerEmail=email,
+    )
+
+
+def test_resolve_fills_unlinked_authors_from_a_known_email():
+    authors = AuthorIdentityCache()
+    authors.resolve(commit("U_1", "Dev@Example.com"))
+    unlinked = commit(None, "dev@example.com")
+    stranger = commit(None, "other@example.com")
+
+    authors.resolve(unlinked)
+    authors.resolve(stranger)
+
+    assert (unlinked.authorId, unlinked.committerId) == ("U_1", "U_1")
+    assert (stranger.authorId, stranger.committerId) == (None, None)
+    assert authors.metrics()["resolved_by_email"] == 2
+
+
+def test_written_users_are_not_written_again():
+    authors = AuthorIdentityCache()
+    users = {user_id: GitUser(id=user_id) for user_id in ("U_1", "U_2")}
+
+    assert [user.id for user in authors.unknown(users)] == ["U_1", "U_2"]
+    authors.mark_written([users["U_1"]])
+
+    assert [user.id for user in authors.unknown(users)] == ["U_2"]
+    assert authors.metrics()["skipped"] == 1
+    assert authors.metrics()["written"] == 1
+
+
+def test_cache_is_reset_past_its_max_size():
+    authors = AuthorIdentityCache(max_size=1)
+    authors.learn(user_id="U_1", email="u1@example.com")
+    authors.warmed_repositories.add("R_1")
+
+    authors.mark_written([GitUser(id="U_2")])
+
+    assert authors.user_ids == {"U_2"}
+    assert authors.ids_by_email == dict()
+    assert authors.warmed_repositories == set()
+
+
+def test_warm_loads_a_repository_once(fake_db):
+    fake_db.responder = lambda query, args: (
+        [{"authorId": "U_1", "authorEmail": "u1@example.com"}]
+        if "authorId" in query
+        else [{"committerId": "U_2", "committerEmail": None}]
+    )
+    authors = AuthorIdentityCache()
+
+    async def warm_twice():
+        mysql_client = await AsyncMysqlClient.connect(
+            logger=base_logger, pool=get_mysql_pool()
+        )
+        try:
+            for _ in range(2):
+                await authors.warm(repo_id="R_1", mysql_client=mysql_client)
+        finally:
+            await mysql_client.close()
+
+    asyncio.run(warm_twice())
+
+    assert len(fake_db.queries) == 2
+    assert all("GROUP BY" in query for query, _ in fake_db.queries)
+    assert authors.user_ids == {"U_1", "U_2"}
+    assert authors.ids_by_email == {"u1@example.com": "U_1"}
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from _config import INGESTION_MAX_ATTEMPTS, base_logger
+from _database_pymysql import AsyncMysqlClient, get_mysql_pool
+from _exceptions import NotFoundException
+from _github_api import GithubClient
+from ingestion import JobKind, JobStatus, jobs
+
+
+def job_row(attempts: int = 0, kind: str = "test") -> dict[str, object]:
+    return {
+        "id": "J_1",
+        "kind": kind,
+        "status": JobStatus.queued,
+        "payload": "{}",
+        "progress": None,
+        "attempts": attempts,
+        "createdAt": datetime(2024, 1, 1),
+        "updatedAt": datetime(2024, 1, 1),
+    }
+
+
+async def with_client(run):
+    mysql_client = await AsyncMysqlClient.connect(
+        logger=base_logger, pool=get_mysql_pool()
+    )
+    try:
+        return await run(mysql_client)
+    finally:
+        await mysql_client.close()
+
+
+def updates(fake_db) -> list[tuple[str, object]]:
+    return [(q, a) for q, a in fake_db.queries if q.startswith("UPDATE ingestion_job")]
+
+
+def test_claim_job_takes_a_queued_job(fake_db):
+    fake_db.responder = lambda query, args: (
+        [job_row()] if query.startswith("SELECT") and "queued" in args else list()
+    )
+
+    job = asyncio.run(with_client(lambda c: jobs.claim_job(mysql_client=c)))
+
+    assert job["status"] == JobStatus.running
+    assert job["attempts"] == 1
+    [(query, args)] = updates(fake_db)
+    assert "id = %s" in query
+    assert "J_1" in args
+
+
+def test_claim_job_gives_up_jobs_whose_worker_keeps_dying(fake_db):
+    job = asyncio.run(with_client(lambda c: jobs.claim_job(mysql_client=c)))
+
+    assert job is None
+    [(give_up, give_up_args)] = updates(fake_db)
+    assert "attempts >= %s" in give_up
+    assert JobStatus.failed in give_up_args
+    assert INGESTION_MAX_ATTEMPTS in give_up_args
+    [(reclaim, reclaim_args)] = [
+        (q, a) for q, a in fake_db.queries if q.startswith("SELECT") and "running" in a
+    ]
+    assert "attempts < %s" in reclaim
+    assert INGESTION_MAX_ATTEMPTS in reclaim_args
+
+
+def test_set_claimed_job_is_fenced_on_attempts(fake_db):
+    job = {**job_row(attempts=2), "status": JobStatus.running}
+
+    asyncio.run(
+        with_client(
+            lambda c: jobs.set_claimed_job(
+                job=job, values={"status": JobStatus.done}, mysql_client=c
+            )
+        )
+    )
+
+    [(query, args)] = updates(fake_db)
+    assert "id = %s" in query
+    assert "attempts = %s" in query
+    assert "J_1" in args and 2 in args
+
+
+def test_heartbeat_cancels_a_job_claimed_by_another_worker(fake_db, monkeypatch):
+    monkeypatch.setattr(jobs, "INGESTION_JOB_HEARTBEAT_INTERVAL", 0.01)
+    fake_db.responder = lambda query, args: (
+        [{"ct": 0}] if "COUNT" in query else list()
+    )
+    job = {**job_row(attempts=1), "status": JobStatus.running}
+
+    async def beat() -> tuple[bool, bool]:
+        handler_task = asyncio.ensure_future(asyncio.sleep(10))
+        lost = await asyncio.wait_for(jobs.heartbeat_job(job, handler_task), 1)
+        await asyncio.sleep(0)
+        return lost, handler_task.cancelled()
+
+    assert asyncio.run(beat()) == (True, True)
+
+
+@pytest.mark.parametrize(
+    "error, attempts, status",
+    [
+        (RuntimeError("boom"), 1, JobStatus.queued),
+        (RuntimeError("boom"), INGESTION_MAX_ATTEMPTS, JobStatus.failed),
+        (NotFoundException(table_name="repository", detail="R_1"), 1, JobStatus.failed),
+    ],
+)
+def test_run_job_retries_only_retryable_errors(
+    fake_db, monkeypatch, error, attempts, status
+):
+    async def handler(**kwargs):
+        raise error
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "test", handler)
+    job = {**job_row(attempts=attempts), "status": JobStatus.running}
+
+    asyncio.run(
+        with_client(
+            lambda c: jobs.run_job(job=job, mysql_client=c, github_client=None)  # type: ignore
+        )
+    )
+
+    [(query, args)] = updates(fake_db)
+    assert args[0] == status
+
+
+def test_track_repository_adds_nothing_if_its_sync_job_can_not_be_queued(fake_db):
+    repository = {
+        "id": "R_1",
+        "isPrivate": False,
+        "createdAt": "2024-01-01T00:00:00Z",
+        "owner": {
+            "__typename": "User",
+            "avatarUrl": "https://avatars.githubusercontent.com/u/1",
+            "userEmail": "",
+            "id": "U_1",
+            "login": "owner",
+            "name": "Owner",
+        },
+        "trackedBranch": {"target": {"id": "C_1"}},
+    }
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"data": {"repository": repository}})
+
+    def responder(query: str, args) -> list[dict[str, object]]:
+        if "@@max_allowed_packet" in query:
+            return [{"max_allowed_packet": 64 * 1024 * 1024}]
+        if query.startswith("INSERT INTO ingestion_job"):
+            raise RuntimeError("lost connection")
+        return list()
+
+    fake_db.responder = responder
+    github_client = GithubClient(
+        token="fake",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+    )
+    track = jobs.JOB_HANDLERS[JobKind.track_repository]
+
+    with pytest.raises(Exception):
+        asyncio.run(
+            with_client(
+                lambda c: track(
+                    name="repo",
+                    owner_login="owner",
+                    branch_name="main",
+                    mysql_client=c,
+                    github_client=github_client,
+                )
+            )
+        )
+
+    calls = fake_db.connections[0].calls
+    assert any(call.startswith("INSERT INTO repository") for call in calls)
+    assert "COMMIT" not in calls
+    assert "ROLLBACK" in calls[calls.index("BEGIN") :]
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from ingestion.pipeline import CommitPipeline
+
+
+def history(pages: int, page_size: int = 2):
+    """fetch_page over `pages` pages of `page_size` node ids, cursors are the
+    index of the next page."""
+    fetched: list[str | None] = list()
+
+    async def fetch_page(cursor: str | None) -> dict:
+        fetched.append(cursor)
+        index = int(cursor or 0)
+        return {
+            "pageInfo": {
+                "hasNextPage": index + 1 < pages,
+                "endCursor": str(index + 1),
+            },
+            "nodes": [f"C_{index}_{i}" for i in range(page_size)],
+        }
+
+    return fetch_page, fetched
+
+
+def transform_page(nodes: list[dict]) -> tuple[list, dict]:
+    return list(nodes), {node: node for node in nodes}
+
+
+def test_pipeline_writes_batches_with_their_cursor_and_stats():
+    fetch_page, fetched = history(pages=3)
+    writes = list()
+
+    async def write_batch(commits, users, cursor, done):
+        writes.append((list(commits), sorted(users), cursor, done))
+
+    pipeline = CommitPipeline(
+        fetch_page=fetch_page,
+        transform_page=transform_page,
+        write_batch=write_batch,
+        cursor="0",
+        write_batch_size=3,
+    )
+    asyncio.run(pipeline.run())
+
+    assert fetched == ["0", "1", "2"]
+    assert writes == [
+        (
+            ["C_0_0", "C_0_1", "C_1_0", "C_1_1"],
+            ["C_0_0", "C_0_1", "C_1_0", "C_1_1"],
+            "2",
+            False,
+        ),
+        (["C_2_0", "C_2_1"], ["C_2_0", "C_2_1"], "3", True),
+    ]
+    metrics = pipeline.metrics()
+    assert [metrics[stage]["items"] for stage in ("fetch", "transform", "write")] == [
+        3,
+        6,
+        6,
+    ]
+    for stage in metrics.values():
+        assert set(stage) == {
+            "items",
+            "busySeconds",
+            "waitingInputSeconds",
+            "waitingOutputSeconds",
+            "itemsPerSecond",
+        }
+
+
+def test_pipeline_failure_cancels_the_other_stages():
+    # the history never ends, only the failing writer can stop the fetcher
+    fetch_page, fetched = history(pages=10_000)
+
+    async def write_batch(commits, users, cursor, done):
+        raise RuntimeError("write failed")
+
+    async def run():
+        pipeline = CommitPipeline(
+            fetch_page=fetch_page,
+            transform_page=transform_page,
+            write_batch=write_batch,
+            write_batch_size=1,
+            queue_size=2,
+        )
+        with pytest.raises(RuntimeError, match="write failed"):
+            await asyncio.wait_for(pipeline.run(), timeout=1)
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+        fetched_at_failure = len(fetched)
+        await asyncio.sleep(0.01)
+        return pending, fetched_at_failure
+
+    pending, fetched_at_failure = asyncio.run(run())
+
+    assert not pending
+    # the fetcher stopped once the bounded queues filled up
+    assert len(fetched) == fetched_at_failure <= 6
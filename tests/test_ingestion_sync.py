@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import httpx
+
+from _config import base_logger
+from _database_pymysql import AsyncMysqlClient, get_mysql_pool
+from _github_api import GithubClient
+from ingestion import sync_repository
+
+REPOSITORY = {
+    "id": "R_1",
+    "trackedBranchRef": "refs/heads/main",
+    "rootCommitIsReached": 1,
+    "backfillHeadId": "C_S",
+    "syncedHeadId": "C_S",
+}
+
+
+def history_node(commit_id: str, day: int) -> dict[str, object]:
+    date = f"2024-01-{day:02d}T00:00:00Z"
+    return {
+        "id": commit_id,
+        "additions": 1,
+        "deletions": 1,
+        "authoredDate": date,
+        "committedDate": date,
+        "author": {"avatarUrl": None, "email": "", "name": "", "user": None},
+        "committer": {"avatarUrl": None, "email": "", "name": "", "user": None},
+    }
+
+
+def github_client(history: list[dict[str, object]]) -> GithubClient:
+    async def handle(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        variables = payload["variables"]
+        if "history(" in payload["query"]:
+            offset = int(variables["after"] or 0)
+            end = offset + variables["first"]
+            history_page = {
+                "pageInfo": {"hasNextPage": end < len(history), "endCursor": str(end)},
+                "nodes": history[offset:end],
+            }
+            data = {"node": {"history": history_page}}
+        else:
+            head = {"target": {"id": history[0]["id"]}}
+            data = {"nodes": [{"trackedBranch": head} for _ in variables["ids"]]}
+        return httpx.Response(200, json={"data": data})
+
+    transport = httpx.MockTransport(handle)
+    return GithubClient(
+        token="fake", http_client=httpx.AsyncClient(transport=transport)
+    )
+
+
+async def sync(history: list[dict[str, object]]) -> dict[str, object]:
+    mysql_client = await AsyncMysqlClient.connect(
+        logger=base_logger, pool=get_mysql_pool()
+    )
+    try:
+        return await sync_repository(
+            repo_id="R_1",
+            mysql_client=mysql_client,
+            github_client=github_client(history),
+            page_size=2,
+        )
+    finally:
+        await mysql_client.close()
+
+
+def test_sync_repository_keeps_merged_commits_older_than_synced_head(fake_db):
+    # C_B comes from a branch merged by C_M, committed before the synced head
+    history = [
+        history_node("C_M", 9),
+        history_node("C_N", 8),
+        history_node("C_S", 7),
+        history_node("C_B", 6),
+        history_node("C_K1", 5),
+        history_node("C_K2", 4),
+        history_node("C_K3", 3),
+        history_node("C_K4", 2),
+    ]
+    known = {"C_S", "C_K1", "C_K2", "C_K3", "C_K4"}
+
+    def responder(query: str, args) -> list[dict[str, object]]:
+        if "@@max_allowed_packet" in query:
+            return [{"max_allowed_packet": 64 * 1024 * 1024}]
+        if query.startswith("SELECT") and "FROM repository" in query:
+            return [REPOSITORY]
+        if query.startswith("SELECT") and "FROM commit" in query:
+            return [{"id": arg} for arg in args if arg in known]
+        return list()
+
+    fake_db.responder = responder
+
+    stats = asyncio.run(sync(history))
+
+    inserted = " ".join(
+        query
+        for query, _ in fake_db.queries
+        if query.startswith("INSERT") and "INTO commit" in query
+    )
+    assert stats["commits"] == 3
+    assert stats["pages"] == 3
+    assert all(f"'{commit_id}'" in inserted for commit_id in ("C_M", "C_N", "C_B"))
+    assert not any(f"'{commit_id}'" in inserted for commit_id in known)
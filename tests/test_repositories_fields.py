@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from _exceptions import WrongAttributesException
+from api.v1.repositories.schema import CommitOut, RepositoryOut
+from api.v1.repositories.service import COMMIT_FIELDS, REPOSITORY_FIELDS
+from api.v1.repositories.utils import parse_fields
+from main import app
+
+ALLOWED = ["id", "name", "createdAt", "committedDate"]
+
+
+def test_parse_fields_defaults_when_empty():
+    for fields in (None, "", " , "):
+        assert parse_fields(fields=fields, allowed=ALLOWED, default=["id"]) == ["id"]
+
+
+def test_parse_fields_rejects_unknown_fields():
+    with pytest.raises(WrongAttributesException):
+        parse_fields(fields="name,password", allowed=ALLOWED, default=["id"])
+
+
+def test_parse_fields_selects_required_fields_first():
+    columns = parse_fields(
+        fields=" name ,createdAt,name",
+        allowed=ALLOWED,
+        default=["id"],
+        required=["committedDate", "id"],
+    )
+
+    assert columns == ["committedDate", "id", "name", "createdAt"]
+
+
+def test_documented_models_cover_every_allowed_field():
+    assert set(REPOSITORY_FIELDS) == set(RepositoryOut.model_fields)
+    assert set(COMMIT_FIELDS) == set(CommitOut.model_fields)
+    assert RepositoryOut.model_json_schema().get("required", list()) == list()
+    assert CommitOut.model_json_schema()["required"] == ["id", "committedDate"]
+
+
+def test_fetch_commits_selects_only_the_asked_fields(fake_db):
+    row = {"committedDate": datetime.datetime(2024, 1, 1), "id": "C_1", "additions": 3}
+    fake_db.responder = lambda query, args: (
+        [row] if query.startswith("SELECT") else list()
+    )
+
+    response = TestClient(app).get(
+        "/api/v1/repositories/commits",
+        params={"repo_id": "R_1", "fields": "additions"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == [
+        {"committedDate": "2024-01-01T00:00:00", "id": "C_1", "additions": 3}
+    ]
+    [(query, _)] = fake_db.queries
+    assert query.startswith("SELECT committedDate, id, additions FROM commit")
+
+
+def test_fetch_commits_rejects_unknown_fields(fake_db):
+    response = TestClient(app).get(
+        "/api/v1/repositories/commits",
+        params={"repo_id": "R_1", "fields": "additions,secret"},
+    )
+
+    assert response.status_code == 400
+    assert fake_db.queries == list()
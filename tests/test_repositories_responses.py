@@ -0,0 +1,137 @@
+import datetime
+
+import orjson
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from _schemas import DataResponse
+from api.v1.repositories.schema import CommitOut, IngestionJobOut, RepositoryOut
+from main import app
+
+REPOSITORY = {
+    "id": "R_1",
+    "name": "repo",
+    "ownerIdUser": "U_1",
+    "ownerIdOrganization": None,
+    "ownerIsOrganization": 0,
+    "ownerLogin": "owner",
+}
+COMMITS = [
+    {
+        "committedDate": datetime.datetime(2024, 1, day, 12, 30, 5),
+        "id": f"C_{day}",
+        "additions": 1,
+        "deletions": 0,
+        "authorAvatarUrl": None,
+        "authorName": "author",
+    }
+    for day in (1, 2)
+]
+JOB = {
+    "id": "J_1",
+    "kind": "sync_repository",
+    "status": "running",
+    "repositoryId": "R_1",
+    "payload": '{"repositoryId": "R_1"}',
+    "progress": None,
+    "error": None,
+    "attempts": 1,
+    "createdAt": datetime.datetime(2024, 1, 1),
+    "updatedAt": datetime.datetime(2024, 1, 1, 0, 1),
+    "startedAt": datetime.datetime(2024, 1, 1, 0, 1),
+    "finishedAt": None,
+}
+
+
+def assert_body_matches(body: dict, model: type[BaseModel]):
+    """The body is what FastAPI would send after validating it against `model`."""
+    parsed = model.model_validate(body)
+    assert parsed.model_dump(mode="json", exclude_unset=True) == body
+
+
+def respond(query: str, args) -> list[dict[str, object]]:
+    if not query.startswith("SELECT"):
+        return list()
+    if "FROM commit" in query:
+        return COMMITS
+    if "FROM ingestion_job" in query:
+        return [JOB]
+    return [REPOSITORY]
+
+
+def test_fetch_repositories_body(fake_db):
+    fake_db.responder = respond
+
+    response = TestClient(app).get("/api/v1/repositories")
+
+    assert response.status_code == 200
+    assert_body_matches(response.json(), DataResponse[list[RepositoryOut]])
+    assert response.json()["data"] == [REPOSITORY]
+
+
+def test_track_repository_body(fake_db):
+    response = TestClient(app).post(
+        "/api/v1/repositories",
+        json={"owner": "owner", "name": "repo", "branch": "main"},
+    )
+
+    assert response.status_code == 202
+    assert_body_matches(response.json(), DataResponse[IngestionJobOut])
+    assert response.json()["data"]["payload"] == {
+        "name": "repo",
+        "owner_login": "owner",
+        "branch_name": "main",
+    }
+
+
+def test_sync_repository_body(fake_db):
+    fake_db.responder = respond
+
+    response = TestClient(app).post(
+        "/api/v1/repositories/sync", params={"repo_id": "R_1"}
+    )
+
+    assert response.status_code == 202
+    assert_body_matches(response.json(), DataResponse[IngestionJobOut])
+
+
+def test_fetch_job_body(fake_db):
+    fake_db.responder = respond
+
+    response = TestClient(app).get("/api/v1/repositories/jobs/J_1")
+
+    assert response.status_code == 200
+    assert_body_matches(response.json(), DataResponse[IngestionJobOut])
+    data = response.json()["data"]
+    assert data["payload"] == {"repositoryId": "R_1"}
+    assert data["createdAt"] == "2024-01-01T00:00:00"
+    assert data["finishedAt"] is None
+
+
+def test_fetch_commits_body(fake_db):
+    fake_db.responder = respond
+
+    response = TestClient(app).get(
+        "/api/v1/repositories/commits", params={"repo_id": "R_1", "limit": 1}
+    )
+
+    assert response.status_code == 200
+    assert_body_matches(response.json(), DataResponse[list[CommitOut]])
+    body = response.json()
+    assert body["data"][0]["committedDate"] == "2024-01-01T12:30:05"
+    assert body["data"][0]["authorAvatarUrl"] is None
+    assert body["next_cursor"]
+
+
+def test_stream_commits_body(fake_db):
+    fake_db.responder = respond
+
+    response = TestClient(app).get(
+        "/api/v1/repositories/commits", params={"repo_id": "R_1", "stream": True}
+    )
+
+    assert response.status_code == 200
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert len(lines) == len(COMMITS)
+    for line in lines:
+        assert_body_matches(line, CommitOut)
@@ -0,0 +1,68 @@
+import asyncio
+import base64
+import datetime
+
+import pytest
+
+from _config import base_logger
+from _database_pymysql import AsyncMysqlClient, get_mysql_pool
+from _exceptions import WrongAttributesException
+from api.v1.repositories.service import get_repositories
+from api.v1.repositories.utils import decode_commit_cursor, encode_commit_cursor
+
+
+def repository_rows(n: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": f"R_{i}",
+            "name": f"repo_{i}",
+            "ownerIdUser": None if i % 2 else f"U_{i}",
+            "ownerIdOrganization": f"O_{i}" if i % 2 else None,
+            "ownerIsOrganization": i % 2,
+            "ownerLogin": f"owner_{i}",
+        }
+        for i in range(n)
+    ]
+
+
+async def list_repositories() -> list[dict[str, object]]:
+    mysql_client = await AsyncMysqlClient.connect(
+        logger=base_logger, pool=get_mysql_pool()
+    )
+    try:
+        return await get_repositories(mysql_client=mysql_client)
+    finally:
+        await mysql_client.close()
+
+
+@pytest.mark.parametrize("n", [0, 1, 10, 1000])
+def test_get_repositories_query_count_is_constant(fake_db, n):
+    fake_db.responder = lambda query, args: (
+        repository_rows(n) if "FROM repository" in query else list()
+    )
+
+    repos = asyncio.run(list_repositories())
+
+    assert len(repos) == n
+    assert all(repo["ownerLogin"] for repo in repos)
+    assert len(fake_db.queries) == 1
+
+
+def test_commit_cursor_round_trips():
+    committed_date = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    cursor = encode_commit_cursor(committed_date=committed_date, commit_id="C_1")
+
+    assert decode_commit_cursor(cursor) == (committed_date, "C_1")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"{}").decode(),
+        base64.urlsafe_b64encode(b'["yesterday", "C_1"]').decode(),
+    ],
+)
+def test_invalid_commit_cursor_is_rejected(cursor):
+    with pytest.raises(WrongAttributesException):
+        decode_commit_cursor(cursor)